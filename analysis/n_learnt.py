@@ -2,12 +2,16 @@ import os
 
 import pandas as pd
 
+from analysis.runs import run_files, read_meta, read_iter
+
 
 def row_for_single_run(csv_path):
 
-    df = pd.read_csv(csv_path, index_col=[0])
+    meta = read_meta(csv_path)
+    df = read_iter(csv_path, columns=["iter", "ss_idx", "ss_iter",
+                                      "n_learnt", "n_seen"])
 
-    agent_id = df["agent"].iloc[0]
+    agent_id = meta["agent"]
 
     last_iter = max(df["iter"])
     is_last_iter = df["iter"] == last_iter
@@ -17,7 +21,7 @@ def row_for_single_run(csv_path):
 
     is_last_ss = df["ss_idx"] == max(df["ss_idx"]) - 1
 
-    ss_n_iter = df["ss_n_iter"][0] - 1
+    ss_n_iter = meta["ss_n_iter"] - 1
 
     is_last_iter_ss = df["ss_iter"] == ss_n_iter
 
@@ -25,9 +29,9 @@ def row_for_single_run(csv_path):
 
     return {
         "agent": agent_id,
-        "learner": df["md_learner"][0],
-        "psy": df["md_psy"][0],
-        "teacher": df["md_teacher"][0],
+        "learner": meta["md_learner"],
+        "psy": meta["md_psy"],
+        "teacher": meta["md_teacher"],
         "n_learnt": n_learnt,
         "n_learnt_end_ss": n_learnt_end_ss,
         "n_seen": n_seen,
@@ -46,10 +50,8 @@ def preprocess_cond(cond_data_folder, preprocess_data_file):
     for j, tp in enumerate(teach_f):
         print("teacher data folder:", tp.name)
 
-        csv_files = [p for p in os.scandir(tp.path) if p.name.endswith("csv")]
-
-        for k, csv_file in enumerate(csv_files):
-            row = row_for_single_run(csv_file.path)
+        for csv_path in run_files(tp.path):
+            row = row_for_single_run(csv_path)
             row_list.append(row)
 
     print("*" * 100)
@@ -4,20 +4,22 @@ import numpy as np
 import pandas as pd
 from tqdm import tqdm
 
+from analysis.runs import run_files, read_iter
+
 
 def preprocess_data(raw_data_folder, preprocess_file):
 
     assert os.path.exists(raw_data_folder)
 
-    path, dirs, files = next(os.walk(raw_data_folder))
-    file_count = len(files)
+    csv_files = run_files(raw_data_folder)
+    file_count = len(csv_files)
 
     assert file_count > 0
 
     row_list = []
 
-    for i, p in tqdm(enumerate(os.scandir(raw_data_folder)), total=file_count):
-        df = pd.read_csv(p.path, index_col=[0])
+    for i, csv_path in tqdm(enumerate(csv_files), total=file_count):
+        df = read_iter(csv_path, columns=["iter", "p_err_mean"])
         df.sort_values("iter", inplace=True)
 
         for t, p_err in enumerate(df["p_err_mean"]):
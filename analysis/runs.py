@@ -0,0 +1,110 @@
+import os
+import json
+
+import numpy as np
+import pandas as pd
+
+from run.recorder import META_EXT, PR_INF_EXT, PR_INF_DELTA_EXT, \
+    TIMING_EXT, delta_decode
+
+
+def meta_path(csv_path):
+    return os.path.splitext(csv_path)[0] + META_EXT
+
+
+def read_meta(csv_path):
+    """
+    Metadata of the run saved in `csv_path`. Files written before the
+    metadata was split from the iterations carry it on every row:
+    take it from the first one
+    """
+    path = meta_path(csv_path)
+    if os.path.exists(path):
+        with open(path) as f:
+            return json.load(f)
+
+    return pd.read_csv(csv_path, index_col=[0], nrows=1).iloc[0].to_dict()
+
+
+def read_iter(csv_path, columns=None):
+    """Per-iteration table of a run, parsing only `columns` if given"""
+    if columns is None:
+        return pd.read_csv(csv_path, index_col=[0])
+    return pd.read_csv(csv_path, usecols=columns)
+
+
+def read_pr_inf(csv_path, mmap=True):
+    """
+    Inferred parameter at each iteration of a run (NaN when not
+    inferred), or None if the run did not save any
+    """
+    stem = os.path.splitext(csv_path)[0]
+    if os.path.exists(stem + PR_INF_EXT):
+        return np.load(stem + PR_INF_EXT, mmap_mode="r" if mmap else None)
+
+    if os.path.exists(stem + PR_INF_DELTA_EXT):
+        with np.load(stem + PR_INF_DELTA_EXT) as f:
+            return delta_decode(**f)
+
+    return None
+
+
+def read_timing(csv_path):
+    """Timing spans of a run (see `run.timing.Spans.summary`), or None"""
+    path = os.path.splitext(csv_path)[0] + TIMING_EXT
+    if not os.path.exists(path):
+        return None
+
+    with open(path) as f:
+        return json.load(f)
+
+
+def run_files(folder):
+    return sorted(p.path for p in os.scandir(folder)
+                  if p.name.endswith("csv") and not p.name.startswith("."))
+
+
+def load_meta(folder):
+    """One row per run of `folder`, indexed by config hash"""
+    row_list = []
+    for csv_path in run_files(folder):
+        meta = read_meta(csv_path)
+        meta["csv_path"] = csv_path
+        row_list.append(meta)
+
+    df = pd.DataFrame(row_list)
+    if "config_hash" in df:
+        df.set_index("config_hash", inplace=True)
+    return df
+
+
+def iter_runs(folder, columns=None):
+    """
+    Yield (metadata, iterations) for every run of `folder`; the
+    iterations are only read (and only `columns` parsed) when reached
+    """
+    for csv_path in run_files(folder):
+        yield read_meta(csv_path), read_iter(csv_path, columns=columns)
+
+
+def load_timing(folder):
+    """
+    One row per (run, part of the simulation loop) of `folder`, with
+    the teacher and learner of the run, and the number of spans, their
+    total duration, p50 and p99 (s)
+    """
+    row_list = []
+    for csv_path in run_files(folder):
+        timing = read_timing(csv_path)
+        if timing is None:
+            continue
+        meta = read_meta(csv_path)
+        for part, t in timing.items():
+            row_list.append({
+                "csv_path": csv_path,
+                "md_teacher": meta["md_teacher"],
+                "md_learner": meta["md_learner"],
+                "part": part,
+                **{k: t[k] for k in ("n", "total", "p50", "p99")}})
+
+    return pd.DataFrame(row_list)
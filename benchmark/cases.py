@@ -0,0 +1,129 @@
+"""
+Configs of the benchmarks: short runs of each learner/teacher pair,
+varying one size (n_item, grid_size, horizon...) at a time around a
+base case
+"""
+
+from settings.config_triton import Config, TEACHER, LEARNER, is_compatible
+from model.psychologist.psychologist_grid import PsyGrid
+from model.teacher.leitner import Leitner
+from model.teacher.conservative import Conservative
+from model.teacher.robust import Robust
+
+# Parameters of each learner. `grid_size` is per parameter, hence
+# much smaller for the 6 parameters of Walsh2018
+LEARNER_SETUP = {
+    "Exponential": {
+        "pr_lab": ["alpha", "beta"],
+        "pr_val": [2e-4, 0.5],
+        "bounds": [[2e-07, 0.025], [0.0001, 0.9999]],
+        "grid_methods": [PsyGrid.GEO, PsyGrid.LIN],
+        "grid_size": 20,
+        "grid_size_ladder": (10, 20, 40, 80),
+    },
+    "Walsh2018": {
+        "pr_lab": ["tau", "s", "b", "m", "c", "x"],
+        "pr_val": [1.0, 0.1, 0.1, 0.2, 0.2, 0.5],
+        "bounds": [[0.5, 1.5], [0.05, 0.2], [0.05, 0.2], [0.1, 0.3],
+                   [0.1, 0.3], [0.3, 0.7]],
+        "grid_methods": [PsyGrid.LIN] * 6,
+        "grid_size": 3,
+        "grid_size_ladder": (2, 3, 4),
+    },
+}
+
+# Base case, and the values taken by each size, one at a time.
+# `horizon` (sessions planned ahead, None for all) and `n_sample`
+# only apply to the teachers that have them
+BASE = {
+    "n_item": 50,
+    "grid_size": None,  # Per learner, see LEARNER_SETUP
+    "horizon": None,
+    "n_sample": 20,
+    "n_ss": 3,
+    "ss_n_iter": 20,
+}
+
+LADDER = {
+    "n_item": (25, 50, 100, 200),
+    "grid_size": None,  # Per learner, see LEARNER_SETUP
+    "horizon": (1, 2, None),
+    "n_sample": (5, 10, 20),
+}
+
+SIZE_OF_TEACHER = {
+    Conservative: ("horizon", ),
+    Robust: ("horizon", "n_sample"),
+}
+
+
+def sizes(teacher_cls):
+    """Sizes that change the work of `teacher_cls`"""
+    # Leitner runs with the true parameter: no grid
+    if teacher_cls == Leitner:
+        return "n_item",
+    return ("n_item", "grid_size") + SIZE_OF_TEACHER.get(teacher_cls, ())
+
+
+def make_config(learner, teacher, n_item, grid_size=None, horizon=None,
+                n_sample=20, n_ss=3, ss_n_iter=20):
+
+    setup = LEARNER_SETUP[learner]
+    teacher_cls = TEACHER[teacher]
+
+    if grid_size is None:
+        grid_size = setup["grid_size"]
+
+    teacher_pr = {}
+    if teacher_cls == Leitner:
+        teacher_pr = {"delay_factor": 2, "delay_min": 4}
+    if teacher_cls in SIZE_OF_TEACHER:
+        teacher_pr["horizon_n_ss"] = horizon
+    if teacher_cls == Robust:
+        teacher_pr["n_sample"] = n_sample
+
+    config_dic = {
+        "data_folder": None,
+        "seed": 0,
+        "agent": 0,
+        "bounds": setup["bounds"],
+        "md_learner": learner,
+        "md_psy": PsyGrid.__name__,
+        "md_teacher": teacher,
+        "omni": False,
+        "n_item": n_item,
+        "is_item_specific": False,
+        "ss_n_iter": ss_n_iter,
+        "time_between_ss": 24 * 60 ** 2,
+        "n_ss": n_ss,
+        "learnt_threshold": 0.9,
+        "time_per_iter": 4,
+        "cst_time": 1,
+        "teacher_pr_lab": list(teacher_pr.keys()),
+        "teacher_pr_val": list(teacher_pr.values()),
+        "psy_pr_lab": ["grid_size", "grid_methods"],
+        "psy_pr_val": [grid_size, setup["grid_methods"]],
+        "pr_lab": setup["pr_lab"],
+        "pr_val": setup["pr_val"],
+    }
+    return Config(config_file=None, config_dic=config_dic, **config_dic)
+
+
+def cases(learners=None, teachers=None):
+    """
+    Yield the (learner, teacher, sizes) of the suite: the base case,
+    then each value of each size of the ladder
+    """
+    for learner in learners or LEARNER:
+        ladder = dict(LADDER)
+        ladder["grid_size"] = LEARNER_SETUP[learner]["grid_size_ladder"]
+        base = dict(BASE, grid_size=LEARNER_SETUP[learner]["grid_size"])
+
+        for teacher in teachers or TEACHER:
+            if not is_compatible(TEACHER[teacher], LEARNER[learner]):
+                continue
+            yield learner, teacher, base
+            for dim in sizes(TEACHER[teacher]):
+                for v in ladder.get(dim, ()):
+                    if v != base[dim]:
+                        yield learner, teacher, dict(base, **{dim: v})
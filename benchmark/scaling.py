@@ -0,0 +1,153 @@
+"""
+Scaling of the latency of `teacher.ask` for each teacher, sweeping one
+size at a time (n_item, grid_size, horizon, n_sample, and ss_n_iter
+for the length of the run) around the base case, with the empirical
+exponent of each size (latency ~ size ** exponent).
+The latency is the mean over the run: it grows with the number of
+items seen, bounded by the number of iterations as much as by n_item.
+
+    python -m benchmark.scaling <name> [learner=A] [teacher=A,B]
+                                       [size=A,B]
+
+Saves data/benchmark/scaling_<name>.csv (latencies),
+data/benchmark/scaling_<name>_fit.csv (exponents) and
+fig/scaling_<name>.png
+"""
+
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+import matplotlib.pyplot as plt
+from tqdm import tqdm
+
+from benchmark.cases import BASE, LEARNER_SETUP, sizes, make_config
+from benchmark.suite import FOLDER, bench, parse_options, show
+from settings.config_triton import TEACHER, LEARNER, is_compatible
+
+SWEEP = {
+    "n_item": (25, 50, 100, 200, 400),
+    "grid_size": (10, 20, 40, 80),
+    "horizon": (1, 2, 4),
+    "n_sample": (5, 10, 20, 40),
+    "ss_n_iter": (5, 10, 20, 40),
+}
+
+# Sessions of the runs, so that the horizon can take all the values
+# of the sweep
+N_SS = 4
+
+
+def base_case(learner):
+    # Horizon of all the sessions, as a number for the fit
+    return dict(BASE, grid_size=LEARNER_SETUP[learner]["grid_size"],
+                n_ss=N_SS, horizon=N_SS)
+
+
+def sweep(learner="Exponential", teachers=None, size_list=None):
+    """Mean latency (s) of `teacher.ask` for each value of each size"""
+    base = base_case(learner)
+
+    case_list = [(teacher, dim, v)
+                 for teacher in teachers or TEACHER
+                 if is_compatible(TEACHER[teacher], LEARNER[learner])
+                 for dim in sizes(TEACHER[teacher]) + ("ss_n_iter", )
+                 if size_list is None or dim in size_list
+                 for v in SWEEP[dim]]
+
+    row_list = []
+    for teacher, dim, v in tqdm(case_list):
+        config = make_config(learner=learner, teacher=teacher,
+                             **dict(base, **{dim: v}))
+        res = bench(config, repeat=1)
+        row_list.append({"learner": learner, "teacher": teacher,
+                         "size": dim, "value": v, "ask": res["ask_mean"],
+                         "run": res["run"]})
+
+    return pd.DataFrame(row_list)
+
+
+def fit(df):
+    """
+    Exponent of each (teacher, size): slope of the least squares fit of
+    log(latency) against log(size), and its R^2
+    """
+    row_list = []
+    for (teacher, dim), d in df.groupby(["teacher", "size"]):
+        x = np.log(d["value"].values.astype(float))
+        y = np.log(d["ask"].values)
+        slope, intercept = np.polyfit(x, y, deg=1)
+        ss_res = np.sum((y - (slope * x + intercept)) ** 2)
+        ss_tot = np.sum((y - y.mean()) ** 2)
+        row_list.append({
+            "teacher": teacher, "size": dim, "exponent": slope,
+            "r2": 1 - ss_res / ss_tot if ss_tot > 0 else np.nan})
+
+    return pd.DataFrame(row_list)
+
+
+def predict(df, fit_df, teacher, **size):
+    """
+    Latency (s) of `teacher.ask` extrapolated to `size` (e.g.
+    n_item=500, grid_size=100) from the base case of the sweep `df`,
+    assuming the sizes act independently
+    """
+    base = base_case(df["learner"].iloc[0])
+    d = df[df["teacher"] == teacher]
+    at_base = d[d["value"] == d["size"].map(base)]
+    latency = np.median(at_base["ask"])
+
+    exponent = fit_df[fit_df["teacher"] == teacher].set_index("size")[
+        "exponent"]
+    for dim, v in size.items():
+        if dim in exponent:
+            latency *= (v / base[dim]) ** exponent[dim]
+    return latency
+
+
+def plot(df, fit_df, f_name):
+
+    dims = [d for d in SWEEP if d in set(df["size"])]
+    fig, axes = plt.subplots(ncols=len(dims), figsize=(4 * len(dims), 4),
+                             squeeze=False)
+
+    for ax, dim in zip(axes[0], dims):
+        for teacher, d in df[df["size"] == dim].groupby("teacher"):
+            exponent = fit_df[(fit_df["teacher"] == teacher)
+                              & (fit_df["size"] == dim)]["exponent"]
+            ax.plot(d["value"], d["ask"], marker="o",
+                    label=f"{teacher} ({exponent.iloc[0]:.2f})")
+        ax.set_xscale("log")
+        ax.set_yscale("log")
+        ax.set_xlabel(dim)
+        ax.set_ylabel("teacher.ask (s)")
+        ax.legend()
+
+    plt.tight_layout()
+    os.makedirs(os.path.dirname(f_name), exist_ok=True)
+    plt.savefig(f_name, dpi=300)
+    plt.close(fig)
+
+
+def main(arg_list):
+
+    name, *arg_list = arg_list
+    opt = parse_options(arg_list)
+
+    df = sweep(learner=opt.get("learner", ["Exponential"])[0],
+               teachers=opt.get("teacher"),
+               size_list=opt.get("size"))
+    fit_df = fit(df)
+
+    os.makedirs(FOLDER, exist_ok=True)
+    df.to_csv(os.path.join(FOLDER, f"scaling_{name}.csv"), index=False)
+    fit_df.to_csv(os.path.join(FOLDER, f"scaling_{name}_fit.csv"),
+                  index=False)
+    plot(df, fit_df, os.path.join("fig", f"scaling_{name}.png"))
+
+    show(fit_df.round(2))
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
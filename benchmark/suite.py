@@ -0,0 +1,165 @@
+"""
+Benchmark of the hot paths (teacher.ask, PsyGrid.update, p_seen...)
+and of whole runs, for the cases of `benchmark.cases`.
+
+    python -m benchmark.suite run <name> [learner=A,B] [teacher=A,B]
+                                         [repeat=n]
+    python -m benchmark.suite compare <base name> <new name> [stat=p50]
+
+Results go to data/benchmark/<name>.csv, with the version of the code
+and the machine in <name>.meta.json
+"""
+
+import os
+import sys
+import json
+import time
+import platform
+import datetime
+import subprocess
+
+import numpy as np
+import pandas as pd
+from tqdm import tqdm
+
+from benchmark.cases import cases, make_config
+from run.make_data_triton import run
+
+import settings.paths as paths
+
+FOLDER = os.path.join(paths.DATA_DIR, "benchmark")
+
+CASE_KEYS = ["learner", "teacher", "n_item", "grid_size", "horizon",
+             "n_sample", "n_ss", "ss_n_iter"]
+
+STATS = ("mean", "p50", "p99")
+
+# Ratio new / base above which `compare` flags a regression
+TOLERANCE = 0.1
+
+
+def bench(config, repeat=3):
+    """
+    Timing (s) of the fastest of `repeat` runs of `config`: whole run,
+    and per part of the simulation loop (see `run.timing.Spans`)
+    """
+    best = None
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        recorder = run(config)
+        duration = time.perf_counter() - t0
+        if best is None or duration < best[0]:
+            best = duration, recorder.timing.summary()
+
+    duration, timing = best
+    res = {"run": duration}
+    for part, t in timing.items():
+        for k in STATS:
+            res[f"{part}_{k}"] = t[k]
+    return res
+
+
+def run_suite(learners=None, teachers=None, repeat=3):
+
+    case_list = list(cases(learners=learners, teachers=teachers))
+
+    row_list = []
+    for learner, teacher, size in tqdm(case_list):
+        config = make_config(learner=learner, teacher=teacher, **size)
+        res = bench(config, repeat=repeat)
+        row_list.append({"learner": learner, "teacher": teacher, **size,
+                         **res})
+
+    return pd.DataFrame(row_list)
+
+
+def git_commit():
+
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=paths.BASE_DIR, stderr=subprocess.DEVNULL).decode().strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def save(df, name):
+
+    os.makedirs(FOLDER, exist_ok=True)
+    df.to_csv(os.path.join(FOLDER, f"{name}.csv"), index=False)
+
+    meta = {
+        "commit": git_commit(),
+        "date": datetime.datetime.now().isoformat(),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "machine": platform.platform(),
+        "processor": platform.processor(),
+    }
+    with open(os.path.join(FOLDER, f"{name}.meta.json"), "w") as f:
+        json.dump(meta, f, indent=4)
+
+
+def load(name):
+    return pd.read_csv(os.path.join(FOLDER, f"{name}.csv"))
+
+
+def compare(base, new, stat="p50"):
+    """
+    Ratio new / base of the duration of whole runs and of `stat` for
+    each part, per case of both `base` and `new` (DataFrames of
+    `run_suite`); `regression` flags the cases where one of them is
+    above 1 + TOLERANCE
+    """
+    col = ["run"] + [c for c in base.columns if c.endswith(f"_{stat}")
+                     and c in new.columns]
+
+    df = base[CASE_KEYS + col].merge(new[CASE_KEYS + col], on=CASE_KEYS,
+                                     suffixes=("_base", "_new"))
+    for c in col:
+        df[c] = df[f"{c}_new"] / df[f"{c}_base"]
+
+    df = df[CASE_KEYS + col]
+    df["regression"] = (df[col] > 1 + TOLERANCE).any(axis=1)
+    return df
+
+
+def show(df):
+
+    with pd.option_context("display.max_rows", None,
+                           "display.max_columns", None,
+                           "display.width", 250):
+        print(df)
+
+
+def parse_options(arg_list):
+    """`key=a,b` arguments as {key: [a, b]}"""
+    return {k: v.split(",") for k, v in (a.split("=", 1) for a in arg_list)}
+
+
+def main(arg_list):
+
+    command, name, *arg_list = arg_list
+
+    if command == "run":
+        opt = parse_options(arg_list)
+        df = run_suite(learners=opt.get("learner"),
+                       teachers=opt.get("teacher"),
+                       repeat=int(opt.get("repeat", [3])[0]))
+        save(df, name)
+        show(df[CASE_KEYS + ["run"]
+                + [c for c in df.columns if c.endswith("_p50")]])
+
+    elif command == "compare":
+        new_name, *arg_list = arg_list
+        opt = parse_options(arg_list)
+        df = compare(load(name), load(new_name),
+                     stat=opt.get("stat", ["p50"])[0])
+        show(df.round(2))
+
+    else:
+        raise ValueError(f"Unknown command {command}")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
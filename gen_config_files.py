@@ -1,11 +1,9 @@
 #!/bin/python3
-import json
 import os
 import shutil
 
 import numpy as np
 from numpy.random import default_rng
-from tqdm import tqdm
 import pandas as pd
 
 from model.learner.exponential import Exponential
@@ -16,6 +14,7 @@ from model.teacher.conservative import Conservative
 
 import settings.paths as paths
 from settings.config_triton import LEARNER, PSYCHOLOGIST, TEACHER
+from settings.sweep import Sweep
 
 
 TEACHER_INV = {v: k for k, v in TEACHER.items()}
@@ -82,18 +81,18 @@ def run_simulation():
         print("Nothing run.")
 
 
-def mod_job_file(template_path: str, config_path: str, saving_path: str) -> None:
+def mod_job_file(template_path: str, n_job: int, saving_path: str) -> None:
     """Call the shell script that modifies the number of parallel branches"""
 
     os.system(f"/bin/sh config/utils/mod_job.sh " 
-              f"{template_path} {config_path} {saving_path}")
+              f"{template_path} {n_job} {saving_path}")
 
 
 def main() -> None:
-    """Set the parameters and generate the JSON config files"""
+    """Set the parameters and generate the sweep specification"""
 
     data_folder = select_data_folder()
-    print("Generating cluster config files...")
+    print("Generating cluster sweep...")
 
     # -------------     SET PARAM HERE      ------------------------ #
 
@@ -145,98 +144,44 @@ def main() -> None:
 
     # ------------------  END OF PARAMETER SETTING -------------------- #
 
-    # ts = datetime.datetime.now().strftime("%Y_%m_%d_%H_%M_%S_%f")
-
-    pbar = tqdm()
-    job_number = 0
-
-    for omni in (True, False):
-        for is_item_specific in (False, True):
-
-            for agent in range(n_agent):
-
-                if not is_item_specific:
-                    pr_val = grid[agent].tolist()
-
-                else:
-                    pr_val = grid_spec[agent].tolist()
-
-                for teacher_md in teacher_models:
-
-                    if teacher_md == Leitner:
-                        teacher_pr = leitner_cst
-                    elif teacher_md in (Myopic, Conservative):
-                        teacher_pr = {}
-                    else:
-                        raise ValueError
-
-                    teacher_pr_lab, teacher_pr_val = dic_to_lab_val(teacher_pr)
-
-                    psy_pr_lab = ["grid_size", "grid_methods"]
-                    psy_pr_val = [grid_size, grid_methods]
-
-                    learner_md_str = LEARNER_INV[learner_md]
-                    psy_md_str = PSY_INV[psy_md]
-                    teacher_md_str = TEACHER_INV[teacher_md]
-
-                    spec_str = 'spec' if is_item_specific else 'Nspec'
-                    omni_str = 'omni' if omni else 'Nomni'
-
-                    data_folder_run = os.path.join(
-                        data_folder,
-                        f"{spec_str}-"
-                        f"{omni_str}",
-                        f"{learner_md_str}-"
-                        f"{psy_md_str}-"
-                        f"{teacher_md_str}")
-
-                    json_content = {
-                        "seed": seed + agent,
-                        "agent": agent,
-                        "bounds": bounds,
-                        "md_learner": learner_md_str,
-                        "md_psy": psy_md_str,
-                        "md_teacher": teacher_md_str,
-                        "omni": omni,
-                        "n_item": n_item,
-                        "teacher_pr_lab": teacher_pr_lab,
-                        "teacher_pr_val": teacher_pr_val,
-                        "psy_pr_lab": psy_pr_lab,
-                        "psy_pr_val": psy_pr_val,
-                        "pr_lab": pr_lab,
-                        "pr_val": pr_val,
-                        "cst_time": cst_time,
-                        "is_item_specific": is_item_specific,
-                        "ss_n_iter": ss_n_iter,
-                        "time_between_ss": time_between_ss,
-                        "n_ss": n_ss,
-                        "learnt_threshold": learnt_threshold,
-                        "time_per_iter": time_per_iter,
-                        "data_folder": data_folder_run,
-                    }
-
-                    f_name = os.path.join(
-                        paths.CONFIG_CLUSTER_DIR,
-                        f"{job_number}-"
-                        f"{learner_md_str}-"
-                        f"{psy_md_str}-"
-                        f"{teacher_md_str}-"
-                        f"a{agent}.json",
-                    )
-
-                    with open(f_name, "w") as f:
-                        json.dump(json_content, f, sort_keys=False, indent=4)
-                    pbar.update()
-                    job_number += 1
-
-    pbar.close()
-    print("Config files created!")
+    learner_md_str = LEARNER_INV[learner_md]
+    psy_md_str = PSY_INV[psy_md]
+
+    sweep = Sweep(
+        axes=[
+            ("omni", [True, False]),
+            ("is_item_specific", [False, True]),
+            ("agent", list(range(n_agent))),
+            ("md_teacher", [TEACHER_INV[t] for t in teacher_models]),
+        ],
+        constants={
+            "seed": seed,
+            "bounds": bounds,
+            "md_learner": learner_md_str,
+            "md_psy": psy_md_str,
+            "n_item": n_item,
+            "psy_pr_lab": ["grid_size", "grid_methods"],
+            "psy_pr_val": [grid_size, grid_methods],
+            "pr_lab": pr_lab,
+            "cst_time": cst_time,
+            "ss_n_iter": ss_n_iter,
+            "time_between_ss": time_between_ss,
+            "n_ss": n_ss,
+            "learnt_threshold": learnt_threshold,
+            "time_per_iter": time_per_iter,
+            "data_folder": data_folder,
+        },
+        teacher_pr={TEACHER_INV[Leitner]: leitner_cst},
+        params={"pr": grid, "pr_item_specific": grid_spec})
+
+    sweep.save(paths.SWEEP_FILE)
+    print(f"Sweep of {sweep.n_job} configs created!")
 
     os.makedirs(paths.LOG_CLUSTER_DIR, exist_ok=True)
 
     mod_job_file(
         os.path.join(paths.TEMPLATE_DIR, "template.job"),
-        paths.CONFIG_CLUSTER_DIR,
+        sweep.n_job,
         os.path.join(paths.BASE_DIR, "simulation.job"),
     )
 
@@ -8,33 +8,76 @@ from multiprocessing import Pool, cpu_count
 from tqdm import tqdm
 
 from run.make_data_triton import run
-from settings.config_triton import Config
+from run.make_data_batch import run_batch, batch_key
+from run import checkpoint
+import settings.paths as paths
+from settings.sweep import Sweep
 
+# Seconds of computation between two checkpoints of a run
+CHECKPOINT_EVERY = 10 * 60
 
-def make_data(config_file):
+# Maximum number of configs simulated in lockstep by one process
+BATCH_SIZE = 32
+
+# Only record the end of the sessions and the evaluation (enough for
+# `analysis.n_learnt`)
+SUMMARY_ONLY = False
+
+
+def make_data(config):
 
-    config = Config.get(config_file)
-    saving_df = run(config=config)
     f_name = f"{config.config_file.split('.')[0]}.csv"
+    ckpt_file = os.path.join(config.data_folder,
+                             f"{config.config_file.split('.')[0]}.ckpt")
     os.makedirs(config.data_folder, exist_ok=True)
-    saving_df.to_csv(os.path.join(config.data_folder, f_name))
+    recorder = run(config=config,
+                   checkpoint_file=ckpt_file,
+                   checkpoint_every=CHECKPOINT_EVERY,
+                   summary_only=SUMMARY_ONLY)
+    recorder.save(config.data_folder, f_name)
+    checkpoint.remove(ckpt_file)
+    return 1
+
+
+def make_data_batch(config_list):
+
+    if len(config_list) == 1:
+        return make_data(config_list[0])
+
+    recorder_list = run_batch(config_list, summary_only=SUMMARY_ONLY)
+    for config, recorder in zip(config_list, recorder_list):
+        f_name = f"{config.config_file.split('.')[0]}.csv"
+        recorder.save(config.data_folder, f_name)
+    return len(config_list)
+
+
+def split_in_batches(configs):
+    """Group the configs that can be simulated in lockstep"""
+    group = {}
+    for k, config in enumerate(configs):
+        key = batch_key(config)
+        if key is None:
+            group[k] = [config]
+        else:
+            group.setdefault(key, []).append(config)
+
+    return [g[k:k + BATCH_SIZE]
+            for g in group.values()
+            for k in range(0, len(g), BATCH_SIZE)]
 
 
 def main():
 
-    files = [
-        p.path
-        for p in os.scandir(os.path.join("config", "triton"))
-        if os.path.splitext(p.path)[1] == ".json"
-    ]
-    file_count = len(files)
-    assert file_count > 0
+    sweep = Sweep.load(paths.SWEEP_FILE)
+    assert sweep.n_job > 0
+
+    batches = split_in_batches(sweep.configs())
 
     with Pool(processes=cpu_count()) as p:
-        max_ = file_count
+        max_ = sweep.n_job
         with tqdm(total=max_) as pbar:
-            for i, _ in enumerate(p.imap_unordered(make_data, files)):
-                pbar.update()
+            for n in p.imap_unordered(make_data_batch, batches):
+                pbar.update(n)
 
 
 if __name__ == "__main__":
@@ -2,7 +2,6 @@
 Run simulations and save results
 """
 
-import os
 import numpy as np
 
 from settings.config_triton import Config
@@ -15,6 +14,7 @@ from model.teacher.leitner import Leitner
 from model.teacher.myopic import Myopic
 from model.teacher.conservative import Conservative
 from model.teacher.robust import Robust
+from model.teacher.info_gain import InfoGain
 
 
 def dic_to_lab_val(dic):
@@ -57,7 +57,7 @@ def main():
 
     if teacher_md == Leitner:
         teacher_pr = leitner_cst
-    elif teacher_md in (Myopic, Conservative, Robust):
+    elif teacher_md in (Myopic, Conservative, Robust, InfoGain):
         teacher_pr = {}
     else:
         raise ValueError
@@ -99,12 +99,11 @@ def main():
         pr_lab=pr_lab,
         pr_val=pr_val,
     )
-    df = run(config=config, with_tqdm=True)
+    recorder = run(config=config, with_tqdm=True)
     f_name = f"{learner_md.__name__}-" \
              f"{psy_md.__name__}-" \
              f"{teacher_md.__name__}.csv"
-    os.makedirs(config.data_folder, exist_ok=True)
-    df.to_csv(os.path.join(config.data_folder, f_name))
+    recorder.save(config.data_folder, f_name)
 
 
 if __name__ == "__main__":
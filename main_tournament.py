@@ -0,0 +1,68 @@
+"""
+Compare the teachers of the sweep agent by agent, with common
+random numbers, and save the paired differences
+"""
+
+import os
+import sys
+from multiprocessing import Pool, cpu_count
+
+import pandas as pd
+from tqdm import tqdm
+
+from run.tournament import run_tournament, paired_differences, agent_key
+import settings.paths as paths
+from settings.sweep import Sweep
+
+ANTITHETIC = True
+
+REFERENCE = "Leitner"
+
+
+def make_tournament(config_list):
+
+    res = run_tournament(config_list, antithetic=ANTITHETIC)
+    config = config_list[0]
+    return {"agent": config.agent,
+            "is_item_specific": config.is_item_specific,
+            "omni": config.omniscient,
+            **res}
+
+
+def split_in_tournaments(configs):
+    """Group the configs of the same agent"""
+    group = {}
+    for config in configs:
+        group.setdefault(agent_key(config), []).append(config)
+    return list(group.values())
+
+
+def main(trial_name):
+
+    sweep = Sweep.load(paths.SWEEP_FILE)
+    assert sweep.n_job > 0
+
+    tournaments = split_in_tournaments(sweep.configs())
+
+    with Pool(processes=cpu_count()) as p:
+        row_list = list(tqdm(p.imap_unordered(make_tournament, tournaments),
+                             total=len(tournaments)))
+
+    condition = ["is_item_specific", "omni"]
+    scores = pd.DataFrame(row_list).sort_values(condition + ["agent"])
+
+    folder = os.path.join(paths.DATA_CLUSTER_DIR, trial_name)
+    os.makedirs(folder, exist_ok=True)
+    scores.to_csv(os.path.join(folder, "tournament_scores.csv"))
+
+    diff = {}
+    for cond, df in scores.groupby(condition):
+        df = df.drop(columns=condition + ["agent"]).dropna(axis=1, how="all")
+        diff[cond] = paired_differences(df, reference=REFERENCE)
+    diff = pd.concat(diff, names=condition)
+    diff.to_csv(os.path.join(folder, "tournament_diff.csv"))
+    print(diff)
+
+
+if __name__ == "__main__":
+    main(sys.argv[1] if len(sys.argv) > 1 else "tournament")
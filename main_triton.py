@@ -5,29 +5,34 @@ Run simulations and save results
 import os
 
 from run.make_data_triton import run
+from run import checkpoint
 
 import settings.paths as paths
-from settings.config_triton import Config
+from settings.sweep import Sweep
 
+# Seconds of computation between two checkpoints of a run: a job
+# stopped at its time limit resumes from the last one when resubmitted
+CHECKPOINT_EVERY = 10 * 60
 
-def main(job_id: int) -> None:
-    """Launch job and save the files"""
+# Only record the end of the sessions and the evaluation (enough for
+# `analysis.n_learnt`)
+SUMMARY_ONLY = False
 
-    f_names = sorted(
-        file_name
-        for file_name in os.listdir(paths.CONFIG_CLUSTER_DIR)
-        if ".json" in file_name)
 
-    f_paths = sorted(
-        os.path.join(paths.CONFIG_CLUSTER_DIR, f_name)
-        for f_name in f_names)
+def main(job_id: int) -> None:
+    """Launch job and save the files"""
 
-    f_path = f_paths[job_id]
-    config = Config.get(f_path)
-    saving_df = run(config=config)
+    config = Sweep.load(paths.SWEEP_FILE).config(job_id)
     f_name = f"{config.config_file.split('.')[0]}.csv"
+    ckpt_file = os.path.join(config.data_folder,
+                             f"{config.config_file.split('.')[0]}.ckpt")
     os.makedirs(config.data_folder, exist_ok=True)
-    saving_df.to_csv(os.path.join(config.data_folder, f_name))
+    recorder = run(config=config,
+                   checkpoint_file=ckpt_file,
+                   checkpoint_every=CHECKPOINT_EVERY,
+                   summary_only=SUMMARY_ONLY)
+    recorder.save(config.data_folder, f_name)
+    checkpoint.remove(ckpt_file)
 
 
 if __name__ == "__main__":
@@ -87,6 +87,11 @@ class Exponential:
         log_lik = np.log(p + EPS)
         return log_lik
 
+    def fr_grid(self, item, grid_param):
+
+        return grid_param[:, 0] \
+            * (1 - grid_param[:, 1]) ** (self.n_pres[item, None] - 1)
+
     def p(self, item, param, now, is_item_specific, cst_time):
 
         if is_item_specific:
@@ -104,6 +109,33 @@ class Exponential:
             p = np.exp(- fr * delta)
         return p
 
+    def rollout_state(self):
+
+        return {"n_pres": self.n_pres.astype(float),
+                "last_pres": self.last_pres.copy()}
+
+    @staticmethod
+    def update_state(state, item, timestamp, cst_time):
+
+        state["n_pres"][item] += 1
+        state["last_pres"][item] = timestamp
+
+    @staticmethod
+    def log_p_state(state, seen, param, is_item_specific, now, cst_time):
+
+        if is_item_specific:
+            n_item = len(state["n_pres"])
+            init_forget = param[:n_item][seen, 0]
+            rep_effect = param[:n_item][seen, 1]
+        else:
+            init_forget, rep_effect = param
+
+        return \
+            -init_forget \
+            * (1 - rep_effect) ** (state["n_pres"][seen] - 1) \
+            * (now - state["last_pres"][seen]) \
+            * cst_time
+
     def update(self, item, timestamp):
 
         self.last_pres[item] = timestamp
@@ -118,3 +150,57 @@ class Exponential:
         self.n_seen = np.sum(self.seen)
 
         self.i += 1
+
+
+class ExponentialBatch:
+    """
+    Exponential learners, one row per agent. The parameter is
+    n_agent x 2, or n_agent x n_item x 2 if item-specific
+    """
+
+    def __init__(self, n_agent, n_item):
+
+        self.agent = np.arange(n_agent)
+        self.n_pres = np.zeros((n_agent, n_item), dtype=int)
+        self.last_pres = np.zeros((n_agent, n_item), dtype=float)
+
+    def p(self, item, param, now, cst_time):
+
+        if param.ndim == 3:
+            init_forget, rep_effect = param[self.agent, item].T
+        else:
+            init_forget, rep_effect = param.T
+
+        fr = init_forget \
+            * (1 - rep_effect) ** (self.n_pres[self.agent, item] - 1)
+
+        delta = now - self.last_pres[self.agent, item]
+
+        delta *= cst_time
+        with np.errstate(divide="ignore", invalid="ignore", over="ignore"):
+            p = np.exp(- fr * delta)
+        return p
+
+    def p_seen(self, param, now, cst_time):
+
+        seen = self.n_pres >= 1
+
+        if param.ndim == 3:
+            init_forget, rep_effect = param[..., 0], param[..., 1]
+        else:
+            init_forget, rep_effect = param[:, 0, None], param[:, 1, None]
+
+        fr = init_forget * (1 - rep_effect) ** (self.n_pres - 1)
+
+        delta = now - self.last_pres
+
+        delta *= cst_time
+        with np.errstate(divide="ignore", invalid="ignore", over="ignore"):
+            p = np.exp(-fr * delta)
+        p[~seen] = 0
+        return p, seen
+
+    def update(self, item, timestamp):
+
+        self.last_pres[self.agent, item] = timestamp
+        self.n_pres[self.agent, item] += 1
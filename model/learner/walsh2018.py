@@ -25,6 +25,10 @@ class Walsh2018:
 
         self.cst_time = cst_time
 
+        self.state = {"n_pres": np.zeros(n_item),
+                      "rep": np.full((n_item, 1), np.nan),
+                      "lag_sum": np.zeros(n_item)}
+
     def p(self, item, param, now, is_item_specific, cst_time):
 
         if len(param.shape) > 1:
@@ -156,8 +160,55 @@ class Walsh2018:
         p = p if response else 1 - p
         return np.log(p + EPS)
 
+    def rollout_state(self):
+
+        return {k: v.copy() for k, v in self.state.items()}
+
+    @staticmethod
+    def update_state(state, item, timestamp, cst_time):
+
+        n = state["n_pres"][item].astype(int)
+        rep = state["rep"]
+        if np.max(n) == rep.shape[1]:
+            rep = np.hstack((rep, np.full(rep.shape, np.nan)))
+            state["rep"] = rep
+
+        with np.errstate(invalid="ignore"):
+            lag = (timestamp - rep[item, n - 1]) * cst_time
+            state["lag_sum"][item] += \
+                np.where(n > 0, 1 / np.log(lag + math.e), 0)
+
+        rep[item, n] = timestamp
+        state["n_pres"][item] += 1
+
+    @staticmethod
+    def log_p_state(state, seen, param, is_item_specific, now, cst_time):
+
+        if is_item_specific:
+            n_item = len(state["n_pres"])
+            tau, s, b, m, c, x = param[:n_item][seen].T
+            x = x[:, None]
+        else:
+            tau, s, b, m, c, x = param
+
+        n = state["n_pres"][seen]
+        delta = (now - state["rep"][seen]) * cst_time
+
+        with np.errstate(divide="ignore", invalid="ignore", over="ignore"):
+            w = delta ** -x
+            _t_ = np.nansum(w * delta, axis=1) / np.nansum(w, axis=1)
+
+            mean_lag = state["lag_sum"][seen] / np.maximum(n - 1, 1)
+            _m_ = n ** c * _t_ ** -(b + m * mean_lag)
+
+            v = (-tau + _m_) / s
+        return -np.logaddexp(0, -v)
+
     def update(self, item, timestamp):
 
+        self.update_state(self.state, item=item, timestamp=timestamp,
+                          cst_time=self.cst_time)
+
         self.seen[item] = True
         self.hist[self.i] = item
         self.ts[self.i] = timestamp
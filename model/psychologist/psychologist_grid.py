@@ -53,6 +53,13 @@ class PsyGrid:
         self.cst_time = cst_time
         self.learner = learner
 
+        # Last recall evaluated with the estimate, keyed by time, number
+        # of learner updates and version of the estimate (bumped when it
+        # changes outside of an update)
+        self.version = 0
+        self.p_seen_key = None
+        self.p_seen_val = None
+
     @staticmethod
     def cartesian_product(*arrays):
 
@@ -117,11 +124,27 @@ class PsyGrid:
         if param is None:
             param = self.est_param
 
-        return self.learner.p_seen(
-            param=param,
-            is_item_specific=self.is_item_specific,
-            cst_time=self.cst_time,
-            now=now)
+        if param is not self.est_param:
+            return self.learner.p_seen(
+                param=param,
+                is_item_specific=self.is_item_specific,
+                cst_time=self.cst_time,
+                now=now)
+
+        key = now, self.learner.i, self.version
+        if key != self.p_seen_key:
+            self.p_seen_val = self.learner.p_seen(
+                param=param,
+                is_item_specific=self.is_item_specific,
+                cst_time=self.cst_time,
+                now=now)
+            self.p_seen_key = key
+
+        return self.p_seen_val
+
+    def has_p_seen(self, now):
+        """Whether the recall with the estimate at `now` is cached"""
+        return self.p_seen_key == (now, self.learner.i, self.version)
 
     def inferred_learner_param(self):
 
@@ -139,6 +162,7 @@ class PsyGrid:
 
         self.log_post[not_is_rep] = lp
         self.est_param[not_is_rep] = np.dot(np.exp(lp), self.grid_param)
+        self.version += 1
 
         return self.est_param
 
@@ -1,164 +1,193 @@
 import numpy as np
 
-from model.learner.exponential import Exponential
+from model.teacher.horizon import HorizonTeacher, window_end
 
 
-class Conservative:
+class Conservative(HorizonTeacher):
 
     def __init__(self, n_item, learnt_threshold, time_per_iter,
-                 n_ss, ss_n_iter, time_between_ss):
+                 n_ss, ss_n_iter, time_between_ss, reuse_plan=True,
+                 horizon_n_ss=None):
 
         self.n_item = n_item
-        self.log_thr = np.log(learnt_threshold)
-
-        self.eval_ts = n_ss * time_between_ss
-        self.review_ts = np.hstack(
-            [
-                np.arange(x, x + (ss_n_iter * time_per_iter), time_per_iter)
-                for x in np.arange(0, time_between_ss * n_ss, time_between_ss)
-            ])
-
-    def _threshold_select(self, n_pres, param, n_item, is_item_specific,
-                          ts, last_pres, cst_time):
-
-        if np.max(n_pres) == 0:
-            item = 0
-        else:
-            seen = n_pres > 0
-
-            log_p_seen = self._cp_log_p_seen(
-                seen=seen,
-                n_pres=n_pres,
-                param=param,
-                n_item=n_item,
-                is_item_specific=is_item_specific,
-                last_pres=last_pres,
-                ts=ts,
-                cst_time=cst_time)
-
-            if np.sum(seen) == n_item or np.min(log_p_seen) <= self.log_thr:
-                item = np.flatnonzero(seen)[np.argmin(log_p_seen)]
-            else:
-                item = np.argmin(seen)
-
-        return item
-
-    @staticmethod
-    def _cp_log_p_seen(seen, n_pres, param, n_item, is_item_specific,
-                       last_pres, ts, cst_time):
-
-        if is_item_specific:
-            init_forget = param[:n_item][seen, 0]
-            rep_effect = param[:n_item][seen, 1]
-        else:
-            init_forget, rep_effect = param
-
-        return \
-            -init_forget \
-            * (1 - rep_effect) ** (n_pres[seen] - 1) \
-            * (ts - last_pres[seen]) \
-            * cst_time
-
-    def _recursive_exp_decay(self, n_pres, last_pres,
-                             future_ts, param, eval_ts,
-                             cst_time, is_item_specific):
+        super().__init__(learnt_threshold=learnt_threshold,
+                         time_per_iter=time_per_iter, n_ss=n_ss,
+                         ss_n_iter=ss_n_iter,
+                         time_between_ss=time_between_ss,
+                         horizon_n_ss=horizon_n_ss)
+
+        # Schedule planned at the last full search (items from step
+        # `plan_step` on), with the catalogue size and parameter it was
+        # planned for
+        self.reuse_plan = reuse_plan
+        self.plan = None
+        self.plan_step = None
+        self.plan_n_item = None
+        self.plan_param = None
+
+    def _recursive_rollout(self, learner_md, state,
+                           future_ts, param, eval_ts,
+                           cst_time, is_item_specific, end_step):
 
         n_item = self.n_item
 
         now = future_ts[0]
         future = future_ts[1:]
 
-        n_pres_current = n_pres
-        last_pres_current = last_pres
+        state_current = state
 
         while True:
 
-            n_pres = n_pres_current[:n_item]
-            last_pres = last_pres_current[:n_item]
+            plan = []
 
-            first_item = self._threshold_select(
-                n_pres=n_pres,
+            n_row = self._n_row(state_current, n_item)
+            first_row = self._threshold_select(
+                learner_md=learner_md,
+                state={k: v[:n_row] for k, v in state_current.items()},
                 param=param,
-                n_item=n_item,
+                n_item=n_row,
                 is_item_specific=is_item_specific,
-                ts=now, last_pres=last_pres,
+                ts=now,
                 cst_time=cst_time)
 
+            first_item = self._item(state_current, first_row)
             n_item = first_item + 1
 
-            n_pres = n_pres_current[:n_item].copy()
-            last_pres = last_pres_current[:n_item].copy()
+            state = self._sub_state(state_current, n_item)
 
-            n_pres[first_item] += 1
-            last_pres[first_item] = now
+            learner_md.update_state(state, item=first_row, timestamp=now,
+                                    cst_time=cst_time)
+
+            plan.append(first_item)
 
             for ts in future:
 
-                item = self._threshold_select(
-                    n_pres=n_pres,
+                row = self._threshold_select(
+                    learner_md=learner_md,
+                    state=state,
                     param=param,
-                    n_item=n_item,
+                    n_item=first_row + 1,
                     is_item_specific=is_item_specific,
-                    ts=ts, last_pres=last_pres,
+                    ts=ts,
                     cst_time=cst_time)
 
-                n_pres[item] += 1
-                last_pres[item] = ts
+                learner_md.update_state(state, item=row, timestamp=ts,
+                                        cst_time=cst_time)
+
+                plan.append(self._item(state, row))
 
-            seen = n_pres > 0
-            log_p_seen = self._cp_log_p_seen(
-                seen=seen,
-                n_pres=n_pres,
+            log_p_seen = self._eval_log_p_seen(
+                learner_md=learner_md,
+                state=state,
                 param=param,
-                n_item=n_item,
                 is_item_specific=is_item_specific,
-                last_pres=last_pres,
-                ts=eval_ts,
-                cst_time=cst_time)
+                cst_time=cst_time,
+                end_step=end_step)
 
             n_learnt = np.sum(log_p_seen > self.log_thr)
             if n_learnt == n_item:
-                break
+                return first_item, np.asarray(plan), n_item
 
             n_item = first_item
             if n_item <= 1:
                 break
 
-        return first_item
+        return first_item, None, None
 
-    def ask(self, psy):
+    def _follows_plan(self, hist, current_step):
 
-        param = psy.inferred_learner_param()
-        hist = psy.learner.hist.copy()
-        cst_time = psy.cst_time
-        learner_model = psy.learner.__class__
-        is_item_specific = psy.is_item_specific
+        if self.plan is None:
+            return False
 
-        if learner_model == Exponential:
+        offset = current_step - self.plan_step
+        if offset <= 0 or offset >= len(self.plan):
+            return False
 
-            no_dummy = hist != Exponential.DUMMY_VALUE
-            current_step = np.sum(no_dummy)
-            current_seen_item = np.unique(hist[no_dummy])
+        return np.array_equal(hist[self.plan_step:current_step],
+                              self.plan[:offset])
 
-            future_ts = self.review_ts[current_step:]
+    def _plan_is_feasible(self, learner_md, current_step, state,
+                          param, is_item_specific, cst_time):
 
-            n_pres = np.zeros(self.n_item)
-            last_pres = np.zeros(self.n_item)
-            for i, item in enumerate(current_seen_item):
-                is_item = hist == item
-                n_pres[item] = np.sum(is_item)
-                last_pres[item] = np.max(self.review_ts[is_item])
+        n_item = self.plan_n_item
+        rest = self.plan[current_step - self.plan_step:]
+        rest_ts = self.review_ts[current_step:current_step + len(rest)]
 
-            item = self._recursive_exp_decay(
-                is_item_specific=is_item_specific,
-                future_ts=future_ts,
-                cst_time=cst_time,
-                eval_ts=self.eval_ts,
+        state = self._sub_state(state, n_item)
+        for item, ts in zip(rest, rest_ts):
+            learner_md.update_state(state, item=self._row(state, item),
+                                    timestamp=ts, cst_time=cst_time)
+
+        log_p_seen = self._eval_log_p_seen(
+            learner_md=learner_md,
+            state=state,
+            param=param,
+            is_item_specific=is_item_specific,
+            cst_time=cst_time,
+            end_step=current_step + len(rest))
+
+        return np.sum(log_p_seen > self.log_thr) == n_item
+
+    def ask(self, psy):
+
+        param = psy.inferred_learner_param()
+        hist = psy.learner.hist
+        cst_time = psy.cst_time
+        learner_md = psy.learner.__class__
+        is_item_specific = psy.is_item_specific
+
+        current_step = psy.learner.i
+
+        end_step = window_end(current_step=current_step,
+                              n_step=len(self.review_ts),
+                              ss_n_iter=self.ss_n_iter,
+                              horizon_n_ss=self.horizon_n_ss)
+        future_ts = self.review_ts[current_step:end_step]
+
+        state = psy.learner.rollout_state()
+        if not is_item_specific:
+            state = self._compress(state, n_slot=len(future_ts))
+
+        # A new search would first probe the item picked over the
+        # whole catalogue. If it is the one planned, and the plan
+        # is still feasible under the current estimate, keep it
+        if self.reuse_plan \
+                and self._follows_plan(hist=hist,
+                                       current_step=current_step):
+
+            planned = self.plan[current_step - self.plan_step]
+            first_row = self._threshold_select(
+                learner_md=learner_md,
+                state=state,
                 param=param,
-                n_pres=n_pres,
-                last_pres=last_pres)
+                n_item=len(state["n_pres"]),
+                is_item_specific=is_item_specific,
+                ts=future_ts[0],
+                cst_time=cst_time)
 
-        else:
-            raise NotImplementedError
+            if self._item(state, first_row) == planned and (
+                    np.array_equal(param, self.plan_param)
+                    or self._plan_is_feasible(
+                        learner_md=learner_md,
+                        current_step=current_step,
+                        state=state,
+                        param=param,
+                        is_item_specific=is_item_specific,
+                        cst_time=cst_time)):
+                self.plan_param = np.array(param)
+                return planned
+
+        item, self.plan, self.plan_n_item = self._recursive_rollout(
+            learner_md=learner_md,
+            state=state,
+            is_item_specific=is_item_specific,
+            future_ts=future_ts,
+            cst_time=cst_time,
+            eval_ts=self.eval_ts,
+            param=param,
+            end_step=end_step)
+
+        self.plan_step = current_step
+        self.plan_param = np.array(param)
 
         return item
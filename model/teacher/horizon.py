@@ -0,0 +1,161 @@
+import numpy as np
+
+
+def window_end(current_step, n_step, ss_n_iter, horizon_n_ss):
+    """
+    End (excluded) of the steps planned explicitly from `current_step`:
+    the end of the `horizon_n_ss`-th session from the current one, or of
+    all the `n_step` steps if `horizon_n_ss` is None
+    """
+    if horizon_n_ss is None:
+        return n_step
+
+    current_ss = current_step // ss_n_iter
+    return min(n_step, (current_ss + horizon_n_ss) * ss_n_iter)
+
+
+def eval_log_p_seen(learner_md, state, param, is_item_specific, cst_time,
+                    eval_ts, tail_ts):
+    """
+    Log-recall at `eval_ts` of the items seen in `state`, with the
+    reviews at `tail_ts` (not planned explicitly) spread over these
+    items: going back from the last review, each one goes to the next
+    item, cycling through them from the least recalled without these
+    reviews, so that every item gets its share of the budget, as late
+    as possible
+    """
+    seen = state["n_pres"] > 0
+
+    log_p_seen = learner_md.log_p_state(
+        state=state,
+        seen=seen,
+        param=param,
+        is_item_specific=is_item_specific,
+        now=eval_ts,
+        cst_time=cst_time)
+
+    if not len(tail_ts) or not np.any(seen):
+        return log_p_seen
+
+    item = np.flatnonzero(seen)[np.argsort(log_p_seen, kind="stable")]
+    n_item = len(item)
+
+    # Reviews counted from the last one, by chunks of different items,
+    # applied in chronological order
+    state = {k: v.copy() for k, v in state.items()}
+    back_ts = np.asarray(tail_ts)[::-1]
+    for first in range((len(back_ts) - 1) // n_item * n_item, -1, -n_item):
+        ts = back_ts[first:first + n_item]
+        learner_md.update_state(state, item=item[:len(ts)], timestamp=ts,
+                                cst_time=cst_time)
+
+    return learner_md.log_p_state(
+        state=state,
+        seen=seen,
+        param=param,
+        is_item_specific=is_item_specific,
+        now=eval_ts,
+        cst_time=cst_time)
+
+
+class HorizonTeacher:
+    """
+    Time grid of the reviews and helpers for the rollouts of the
+    teachers that plan the remaining reviews (Conservative, Robust)
+    """
+
+    def __init__(self, learnt_threshold, time_per_iter, n_ss, ss_n_iter,
+                 time_between_ss, horizon_n_ss=None):
+
+        self.log_thr = np.log(learnt_threshold)
+
+        self.eval_ts = n_ss * time_between_ss
+        self.ss_start_ts = np.arange(0, time_between_ss * n_ss,
+                                     time_between_ss)
+        self.review_ts = np.hstack(
+            [
+                np.arange(x, x + (ss_n_iter * time_per_iter), time_per_iter)
+                for x in self.ss_start_ts
+            ])
+
+        # Receding horizon: number of sessions planned explicitly
+        # (None for all the remaining ones)
+        self.horizon_n_ss = horizon_n_ss
+        self.ss_n_iter = ss_n_iter
+
+    @staticmethod
+    def _compress(state, n_slot):
+        # Items with the same presentations are interchangeable when the
+        # parameter is shared: keep the seen items and only the unseen
+        # ones `n_slot` reviews could introduce (the lowest indexed,
+        # as new items are picked in order), with a map row -> item
+        seen = state["n_pres"] > 0
+        item = np.union1d(np.flatnonzero(seen),
+                          np.flatnonzero(~seen)[:n_slot])
+        state = {k: v[item] for k, v in state.items()}
+        state["item"] = item
+        return state
+
+    @staticmethod
+    def _n_row(state, n_item):
+        if "item" in state:
+            return np.searchsorted(state["item"], n_item)
+        return n_item
+
+    @staticmethod
+    def _item(state, row):
+        if "item" in state:
+            return state["item"][row]
+        return row
+
+    @staticmethod
+    def _row(state, item):
+        if "item" in state:
+            return np.searchsorted(state["item"], item)
+        return item
+
+    @classmethod
+    def _sub_state(cls, state, n_item):
+        n_row = cls._n_row(state, n_item)
+        return {k: v[:n_row].copy() for k, v in state.items()}
+
+    def _eval_log_p_seen(self, learner_md, state, param,
+                         is_item_specific, cst_time, end_step):
+        """
+        Log-recall at evaluation of the items seen in `state`, planned
+        up to `end_step` (see `eval_log_p_seen` for the reviews
+        after it)
+        """
+        return eval_log_p_seen(
+            learner_md=learner_md,
+            state=state,
+            param=param,
+            is_item_specific=is_item_specific,
+            cst_time=cst_time,
+            eval_ts=self.eval_ts,
+            tail_ts=self.review_ts[end_step:])
+
+    def _threshold_select(self, learner_md, state, param, n_item,
+                          is_item_specific, ts, cst_time):
+
+        n_pres = state["n_pres"]
+
+        if np.max(n_pres) == 0:
+            item = 0
+        else:
+            seen = n_pres > 0
+
+            log_p_seen = learner_md.log_p_state(
+                state=state,
+                seen=seen,
+                param=param,
+                is_item_specific=is_item_specific,
+                now=ts,
+                cst_time=cst_time)
+
+            if np.sum(seen) == n_item or np.min(log_p_seen) <= self.log_thr:
+                item = np.flatnonzero(seen)[np.argmin(log_p_seen)]
+            else:
+                item = np.argmin(seen)
+
+        return item
@@ -0,0 +1,89 @@
+import numpy as np
+from scipy.special import xlogy
+
+from model.learner.exponential import Exponential
+
+EPS = np.finfo(np.float64).eps
+
+
+class InfoGain:
+
+    def __init__(self, n_item, learnt_threshold, info_weight=0.5):
+
+        self.n_item = n_item
+        self.learnt_threshold = learnt_threshold
+        self.info_weight = info_weight
+
+        # Forgetting rate of each seen item under every grid parameter,
+        # recomputed only for the items presented since the last ask
+        self.fr_grid = None
+        self.key_i = 0
+
+    def _update_fr_grid(self, psy):
+
+        learner = psy.learner
+
+        if self.fr_grid is None or learner.i < self.key_i:
+            self.fr_grid = np.zeros((self.n_item, len(psy.grid_param)))
+            item = np.flatnonzero(learner.seen)
+        else:
+            item = np.unique(learner.hist[self.key_i:learner.i])
+
+        if len(item):
+            self.fr_grid[item] = learner.fr_grid(item=item,
+                                                 grid_param=psy.grid_param)
+        self.key_i = learner.i
+
+    def _cp_p_and_info(self, psy, item, now):
+
+        self._update_fr_grid(psy)
+
+        if psy.is_item_specific:
+            post = np.exp(psy.log_post[item])
+        else:
+            post = np.exp(psy.log_post)[None, :]
+
+        # Skip the grid points without posterior mass for any candidate
+        support = np.flatnonzero(np.any(post > EPS, axis=0))
+        post = post[:, support]
+
+        delta = (now - psy.learner.last_pres[item]) * psy.cst_time
+        neg_log_p = self.fr_grid[item][:, support] * delta[:, None]
+        p = np.exp(-neg_log_p)
+        q = -np.expm1(-neg_log_p)
+
+        p_mean = np.sum(post * p, axis=1)
+
+        # Mutual information between the response and the parameter:
+        # entropy of the predictive minus expected entropy given the
+        # parameter
+        info = np.sum(post * (xlogy(q, q) - p * neg_log_p), axis=1) \
+            - xlogy(p_mean, p_mean) - xlogy(1 - p_mean, 1 - p_mean)
+
+        return p_mean, info
+
+    def ask(self, psy, now):
+
+        if psy.learner.__class__ != Exponential:
+            raise ValueError("InfoGain is not implemented for the learner "
+                             f"{psy.learner.__class__.__name__}")
+
+        seen = psy.learner.seen
+        seen_item = np.flatnonzero(seen)
+
+        if psy.omniscient:
+            p, _ = psy.p_seen(now)
+            info = np.zeros(len(seen_item))
+        else:
+            p, info = self._cp_p_and_info(psy=psy, item=seen_item, now=now)
+
+        if len(seen_item) == self.n_item \
+                or np.min(p) <= self.learnt_threshold:
+            # Information is at most log(2) nats for a binary response
+            score = (1 - self.info_weight) * (1 - p) \
+                + self.info_weight * info / np.log(2)
+            item_idx = seen_item[np.argmax(score)]
+        else:
+            item_idx = np.argmin(seen)
+
+        return item_idx
@@ -1,3 +1,5 @@
+import heapq
+
 import numpy as np
 
 
@@ -16,9 +18,19 @@ class Leitner:
         self.box = box
         self.due = due
 
+        # Min-heap of (due time, item) over the seen items. Entries made
+        # outdated by a later update are dropped when they reach the top
+        self.due_heap = []
+        self.n_seen = 0
+        # All the items before this one have been seen
+        self.next_new = 0
+
     def update_box_and_due_time(self, last_idx,
                                 last_was_success, last_time_reply):
 
+        if self.box[last_idx] < 0:
+            self.n_seen += 1
+
         if last_was_success:
             self.box[last_idx] += 1
         else:
@@ -30,26 +42,90 @@ class Leitner:
         self.due[last_idx] = \
             last_time_reply + self.delay_min * delay
 
+        heapq.heappush(self.due_heap, (self.due[last_idx], last_idx))
+
+    def _next_due(self):
+
+        while True:
+            due, idx = self.due_heap[0]
+            if due == self.due[idx]:
+                return due, idx
+            heapq.heappop(self.due_heap)
+
     def _pickup_item(self, now):
 
-        seen = np.argwhere(np.asarray(self.box) >= 0).flatten()
-        n_seen = len(seen)
+        if self.n_seen:
+            due, idx = self._next_due()
+            if self.n_seen == self.n_item or due <= now:
+                return idx
 
-        if n_seen == self.n_item:
-            return np.argmin(self.due)
+        return self._pickup_new()
+
+    def _pickup_new(self):
+
+        while self.next_new < self.n_item and self.box[self.next_new] >= 0:
+            self.next_new += 1
+
+        if self.next_new == self.n_item:
+            return np.argmin(self.box)
+        return self.next_new
+
+    def ask(self, now, last_was_success, last_time_reply, idx_last_q):
+
+        if idx_last_q is None:
+            item_idx = self._pickup_new()
 
         else:
-            seen__due = np.asarray(self.due)[seen]
-            seen__is_due = np.asarray(seen__due) <= now
-            if np.sum(seen__is_due):
-                seen_and_is_due__due = seen__due[seen__is_due]
 
-                return seen[seen__is_due][np.argmin(seen_and_is_due__due)]
-            else:
-                return self._pickup_new()
+            self.update_box_and_due_time(
+                last_idx=idx_last_q,
+                last_was_success=last_was_success,
+                last_time_reply=last_time_reply)
+            item_idx = self._pickup_item(now)
+
+        return item_idx
+
+
+class LeitnerBatch:
+    """Leitner teachers run in lockstep, one row of box/due per agent"""
+
+    def __init__(self, n_agent, n_item, delay_factor, delay_min):
+
+        self.n_item = n_item
+
+        self.delay_factor = delay_factor
+        self.delay_min = delay_min
+
+        self.agent = np.arange(n_agent)
+        self.box = np.full((n_agent, n_item), -1)
+        self.due = np.full((n_agent, n_item), -1)
+
+    def update_box_and_due_time(self, last_idx,
+                                last_was_success, last_time_reply):
+
+        box = self.box[self.agent, last_idx]
+        box = np.where(last_was_success, box + 1, np.maximum(0, box - 1))
+        self.box[self.agent, last_idx] = box
+
+        with np.errstate(over="ignore"):
+            delay = self.delay_factor ** box
+            self.due[self.agent, last_idx] = \
+                last_time_reply + self.delay_min * delay
+
+    def _pickup_item(self, now):
+
+        seen = self.box >= 0
+        all_seen = np.all(seen, axis=1)
+        is_due = seen & (self.due <= now)
+        has_due = np.any(is_due, axis=1)
+
+        candidate = is_due | all_seen[:, None]
+        due_item = np.argmin(np.where(candidate, self.due, np.inf), axis=1)
+
+        return np.where(all_seen | has_due, due_item, self._pickup_new())
 
     def _pickup_new(self):
-        return np.argmin(self.box)
+        return np.argmin(self.box, axis=1)
 
     def ask(self, now, last_was_success, last_time_reply, idx_last_q):
 
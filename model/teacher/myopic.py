@@ -1,5 +1,10 @@
+import math
+import heapq
+
 import numpy as np
 
+from model.learner.exponential import Exponential
+
 
 class Myopic:
 
@@ -7,9 +12,98 @@ class Myopic:
 
         self.n_item = n_item
         self.learnt_threshold = learnt_threshold
+        self.log_thr = math.log(learnt_threshold)
+
+        # Exponential learner and omniscient psychologist only (the
+        # estimate of the other psychologists changes for many items at
+        # every update): time at which each seen item falls under the
+        # threshold, a min-heap of (crossing time, item) for the items
+        # not crossed yet, and which items have crossed. Items are
+        # re-keyed when presented
+        self.cross_ts = np.full(n_item, np.inf)
+        self.cross_heap = []
+        self.is_crossed = np.zeros(n_item, dtype=bool)
+        self.key_i = None
+        self.key_now = -np.inf
+        # All the items before this one have been seen
+        self.next_new = 0
+
+    def _rekey(self, item, learner, param, is_item_specific, cst_time):
+
+        if is_item_specific:
+            init_forget, rep_effect = param[item]
+        else:
+            init_forget, rep_effect = param
+
+        n_pres = int(learner.n_pres[item])
+        fr = init_forget * (1 - rep_effect) ** (n_pres - 1) * cst_time
+
+        # Never under the threshold if not seen or not forgetting
+        if n_pres > 0 and fr > 0:
+            cross_ts = float(learner.last_pres[item]) - self.log_thr / fr
+            heapq.heappush(self.cross_heap, (cross_ts, item))
+        else:
+            cross_ts = np.inf
+
+        self.cross_ts[item] = cross_ts
+        self.is_crossed[item] = False
+
+    def _update_index(self, psy, now):
+
+        learner = psy.learner
+
+        if self.key_i is None or now < self.key_now \
+                or learner.i < self.key_i:
+            item = np.flatnonzero(learner.n_pres).tolist()
+            self.cross_ts[:] = np.inf
+            self.cross_heap = []
+            self.is_crossed[:] = False
+        else:
+            # Items presented since the last ask
+            item = set(learner.hist[self.key_i:learner.i].tolist())
+
+        for i in item:
+            self._rekey(item=i, learner=learner, param=psy.est_param,
+                        is_item_specific=psy.is_item_specific,
+                        cst_time=psy.cst_time)
+
+        self.key_now = now
+        self.key_i = learner.i
+
+        while self.cross_heap and self.cross_heap[0][0] <= now:
+            cross_ts, i = heapq.heappop(self.cross_heap)
+            if cross_ts == self.cross_ts[i]:
+                self.is_crossed[i] = True
+
+    def _ask_from_index(self, psy, now):
+
+        self._update_index(psy=psy, now=now)
+
+        if self.is_crossed.any():
+            # The least recalled item is under the threshold
+            # so it is one of the crossed ones
+            crossed = np.flatnonzero(self.is_crossed)
+            p = psy.p(item=crossed, param=psy.est_param, now=now)
+            return crossed[np.argmin(p)]
+
+        seen = psy.learner.seen
+        while self.next_new < self.n_item and seen[self.next_new]:
+            self.next_new += 1
+
+        if self.next_new < self.n_item:
+            return self.next_new
+
+        return None
 
     def ask(self, psy, now):
 
+        # Unless the recall of all the items is already evaluated
+        if psy.learner.__class__ == Exponential and psy.omniscient \
+                and not psy.has_p_seen(now):
+            item_idx = self._ask_from_index(psy=psy, now=now)
+            if item_idx is not None:
+                return item_idx
+
         p, seen = psy.p_seen(now)
         min_p = np.min(p)
 
@@ -19,3 +113,21 @@ class Myopic:
             item_idx = np.argmin(seen)
 
         return item_idx
+
+
+class MyopicBatch:
+    """Myopic teachers of omniscient psychologists run in lockstep"""
+
+    def __init__(self, n_item, learnt_threshold):
+
+        self.n_item = n_item
+        self.learnt_threshold = learnt_threshold
+
+    def ask(self, p_seen, seen):
+
+        p = np.where(seen, p_seen, np.inf)
+        least_p_item = np.argmin(p, axis=1)
+        min_p = p[np.arange(len(p)), least_p_item]
+
+        use_seen = np.all(seen, axis=1) | (min_p <= self.learnt_threshold)
+        return np.where(use_seen, least_p_item, np.argmin(seen, axis=1))
@@ -1,104 +1,95 @@
 import numpy as np
+from scipy.special import logsumexp
 
-from model.learner.exponential import Exponential
+from model.teacher.horizon import HorizonTeacher, window_end
 
 
-class Robust:
+class Robust(HorizonTeacher):
 
     def __init__(self, n_item, learnt_threshold, time_per_iter,
-                 n_ss, ss_n_iter, time_between_ss, n_sample=20):
+                 n_ss, ss_n_iter, time_between_ss, n_sample=20,
+                 reuse_samples=False, ess_threshold=0.5,
+                 cover_threshold=0.5, refresh=0.5, horizon_n_ss=None,
+                 warm_start=False, rng=None):
 
-        self.n_sample = n_sample
-
-        self.n_item = n_item
-        self.log_thr = np.log(learnt_threshold)
-
-        self.eval_ts = n_ss * time_between_ss
-        self.review_ts = np.hstack(
-            [
-                np.arange(x, x + (ss_n_iter * time_per_iter), time_per_iter)
-                for x in np.arange(0, time_between_ss * n_ss, time_between_ss)
-            ])
-
-    def _threshold_select(self, n_pres, param, n_item, is_item_specific,
-                          ts, last_pres, cst_time):
-
-        if np.max(n_pres) == 0:
-            item = 0
-        else:
-            seen = n_pres > 0
-
-            log_p_seen = self._cp_log_p_seen(
-                seen=seen,
-                n_pres=n_pres,
-                param=param,
-                n_item=n_item,
-                is_item_specific=is_item_specific,
-                last_pres=last_pres,
-                ts=ts,
-                cst_time=cst_time)
-
-            if np.sum(seen) == n_item or np.min(log_p_seen) <= self.log_thr:
-                item = np.flatnonzero(seen)[np.argmin(log_p_seen)]
-            else:
-                item = np.argmin(seen)
-
-        return item
+        self.rng = np.random.default_rng() if rng is None else rng
 
-    @staticmethod
-    def _cp_log_p_seen(seen, n_pres, param, n_item, is_item_specific,
-                       last_pres, ts, cst_time):
+        self.n_sample = n_sample
 
-        if is_item_specific:
-            init_forget = param[:n_item][seen, 0]
-            rep_effect = param[:n_item][seen, 1]
-        else:
-            init_forget, rep_effect = param
+        # Opt-in: keep the particles across asks, reweighted, the oldest
+        # `refresh` share of them drawn again at each ask, while the
+        # effective sample size is at least `ess_threshold * n_sample`
+        # and the posterior mass at the particles at least
+        # `cover_threshold` times the one at the previous ask;
+        # otherwise draw a fresh set at every ask
+        self.reuse_samples = reuse_samples
+        self.ess_threshold = ess_threshold
+        self.log_cover_threshold = np.log(cover_threshold)
+        self.refresh = refresh
+
+        # Particle set (grid indices of the samples, log-posterior at
+        # the samples when last weighted, normalized importance
+        # log-weights, number of asks since drawn, log-posterior mass at
+        # the samples, and number learnt by each particle at last ask)
+        self.smp_idx = None
+        self.smp_log_post = None
+        self.smp_log_w = None
+        self.smp_age = None
+        self.smp_log_cover = None
+        self.smp_n_learnt = None
+
+        # Approximation (opt-in): start the rollout of each particle from
+        # the catalogue it could learn at the previous ask plus one item,
+        # instead of the full catalogue. Faster, but the catalogue then
+        # grows by at most one item per ask, which changes the schedule
+        self.warm_start = warm_start
+
+        # Per-item cumulative posterior, recomputed only for the items
+        # whose log-posterior changed since the last draw
+        self.cdf = None
+        self.cdf_log_post = None
 
-        return \
-            -init_forget \
-            * (1 - rep_effect) ** (n_pres[seen] - 1) \
-            * (ts - last_pres[seen]) \
-            * cst_time
+        self.n_item = n_item
+        super().__init__(learnt_threshold=learnt_threshold,
+                         time_per_iter=time_per_iter, n_ss=n_ss,
+                         ss_n_iter=ss_n_iter,
+                         time_between_ss=time_between_ss,
+                         horizon_n_ss=horizon_n_ss)
 
-    def _cp_reward(self,
-                   n_pres, last_pres,
+    def _cp_reward(self, learner_md, state,
                    future_ts, param, eval_ts,
-                   is_item_specific, cst_time,
+                   is_item_specific, cst_time, end_step,
                    min_n_learnt=0):
 
         n_item = min_n_learnt + 1
 
-        n_pres_current = n_pres
-        last_pres_current = last_pres
+        state_current = state
 
         while True:
 
-            n_pres = n_pres_current[:n_item].copy()
-            last_pres = last_pres_current[:n_item].copy()
+            state = self._sub_state(state_current, n_item)
+            n_row = len(state["n_pres"])
 
             for ts in future_ts:
-                item = self._threshold_select(
-                    n_pres=n_pres,
+                row = self._threshold_select(
+                    learner_md=learner_md,
+                    state=state,
                     param=param,
-                    n_item=n_item,
+                    n_item=n_row,
                     is_item_specific=is_item_specific,
-                    ts=ts, last_pres=last_pres,
+                    ts=ts,
                     cst_time=cst_time)
 
-                n_pres[item] += 1
-                last_pres[item] = ts
+                learner_md.update_state(state, item=row, timestamp=ts,
+                                        cst_time=cst_time)
 
-            seen = n_pres > 0
-            log_p_seen = self._cp_log_p_seen(
-                seen=seen,
-                n_pres=n_pres,
+            log_p_seen = self._eval_log_p_seen(
+                learner_md=learner_md,
+                state=state,
                 param=param,
-                n_item=n_item,
                 is_item_specific=is_item_specific,
-                last_pres=last_pres,
-                ts=eval_ts,
-                cst_time=cst_time)
+                cst_time=cst_time,
+                end_step=end_step)
 
             n_learnt = np.sum(log_p_seen > self.log_thr)
             if n_learnt == n_item:
@@ -112,62 +103,59 @@ class Robust:
 
         return n_learnt
 
-    def _exp_decay(self, n_pres, last_pres,
-                   future_ts, param, eval_ts,
-                   cst_time, is_item_specific):
+    def _rollout(self, learner_md, state,
+                 future_ts, param, eval_ts,
+                 cst_time, is_item_specific, end_step, n_item=None):
 
-        n_item = self.n_item
+        if n_item is None:
+            n_item = self.n_item
 
         now = future_ts[0]
         future = future_ts[1:]
 
-        n_pres_current = n_pres
-        last_pres_current = last_pres
+        state_current = state
 
         while True:
 
-            n_pres = n_pres_current[:n_item]
-            last_pres = last_pres_current[:n_item]
-
-            first_item = self._threshold_select(
-                n_pres=n_pres,
+            n_row = self._n_row(state_current, n_item)
+            first_row = self._threshold_select(
+                learner_md=learner_md,
+                state={k: v[:n_row] for k, v in state_current.items()},
                 param=param,
-                n_item=n_item,
+                n_item=n_row,
                 is_item_specific=is_item_specific,
-                ts=now, last_pres=last_pres,
+                ts=now,
                 cst_time=cst_time)
 
+            first_item = self._item(state_current, first_row)
             n_item = first_item + 1
 
-            n_pres = n_pres_current[:n_item].copy()
-            last_pres = last_pres_current[:n_item].copy()
+            state = self._sub_state(state_current, n_item)
 
-            n_pres[first_item] += 1
-            last_pres[first_item] = now
+            learner_md.update_state(state, item=first_row, timestamp=now,
+                                    cst_time=cst_time)
 
             for ts in future:
 
-                item = self._threshold_select(
-                    n_pres=n_pres,
+                row = self._threshold_select(
+                    learner_md=learner_md,
+                    state=state,
                     param=param,
-                    n_item=n_item,
+                    n_item=first_row + 1,
                     is_item_specific=is_item_specific,
-                    ts=ts, last_pres=last_pres,
+                    ts=ts,
                     cst_time=cst_time)
 
-                n_pres[item] += 1
-                last_pres[item] = ts
+                learner_md.update_state(state, item=row, timestamp=ts,
+                                        cst_time=cst_time)
 
-            seen = n_pres > 0
-            log_p_seen = self._cp_log_p_seen(
-                seen=seen,
-                n_pres=n_pres,
+            log_p_seen = self._eval_log_p_seen(
+                learner_md=learner_md,
+                state=state,
                 param=param,
-                n_item=n_item,
                 is_item_specific=is_item_specific,
-                last_pres=last_pres,
-                ts=eval_ts,
-                cst_time=cst_time)
+                cst_time=cst_time,
+                end_step=end_step)
 
             n_learnt = np.sum(log_p_seen > self.log_thr)
             if n_learnt == n_item:
@@ -179,97 +167,218 @@ class Robust:
 
         return first_item, n_learnt
 
-    def create_param_samples(self, log_post,
-                             is_item_specific,
-                             grid_param,
-                             n_sample):
+    def _cp_cdf(self, log_post, is_item_specific):
+
+        if not is_item_specific:
+            cdf = np.cumsum(np.exp(log_post))
+            return cdf / cdf[-1]
+
+        if self.cdf is None or self.cdf.shape != log_post.shape:
+            changed = np.ones(log_post.shape[0], dtype=bool)
+            self.cdf = np.zeros(log_post.shape)
+            self.cdf_log_post = np.zeros(log_post.shape)
+        else:
+            changed = np.any(log_post != self.cdf_log_post, axis=1)
+
+        if np.sum(changed):
+            cdf = np.cumsum(np.exp(log_post[changed]), axis=1)
+            self.cdf[changed] = cdf / cdf[:, -1:]
+            self.cdf_log_post[changed] = log_post[changed]
+
+        return self.cdf
 
-        post = np.exp(log_post)
-        n_param_set, n_param = grid_param.shape
+    def _sample_idx(self, log_post, is_item_specific, n_sample):
+
+        cdf = self._cp_cdf(log_post=log_post,
+                           is_item_specific=is_item_specific)
 
         if is_item_specific:
-            n_item, n_param_set = log_post.shape
-            param_list = np.zeros((n_sample, n_item, n_param))
-            weights = np.zeros((n_sample, n_item))
-            for i in range(n_item):
-                slc = np.random.choice(np.arange(n_param_set),
-                                       p=post[i], size=n_sample)
-                param_list[:, i, :] = grid_param[slc]
-                # weights[:, i] = post[i, slc]
-                weights[:, i] = log_post[i, slc]
-            weights = np.sum(weights, axis=1)
-            # weights = np.mean(weights, axis=1)
+            # Search all the items at once in a single sorted array,
+            # shifting each row of the cdf by its item index
+            n_item, n_param_set = cdf.shape
+            offset = np.arange(n_item)
+            u = self.rng.random((n_sample, n_item)) + offset
+            flat_idx = np.searchsorted((cdf + offset[:, None]).ravel(), u,
+                                       side="right")
+            smp_idx = flat_idx - offset * n_param_set
         else:
-            slc = np.random.choice(np.arange(n_param_set),
-                                   p=post, size=n_sample)
-            param_list = grid_param[slc]
-            # weights = post[slc]
-            weights = log_post[slc]
+            n_param_set = len(cdf)
+            smp_idx = np.searchsorted(cdf, self.rng.random(n_sample),
+                                      side="right")
 
-        return param_list, weights
+        return np.minimum(smp_idx, n_param_set - 1)
 
-    def get_future_timestamp_n_pres_last_pres(self, hist):
+    @staticmethod
+    def _log_post_at(log_post, smp_idx, is_item_specific):
+
+        if is_item_specific:
+            return log_post[np.arange(log_post.shape[0]), smp_idx]
+        else:
+            return log_post[smp_idx]
 
-        no_dummy = hist != Exponential.DUMMY_VALUE
-        current_step = np.sum(no_dummy)
-        current_seen_item = np.unique(hist[no_dummy])
+    def create_param_samples(self, log_post,
+                             is_item_specific,
+                             grid_param,
+                             n_sample):
 
-        future_ts = self.review_ts[current_step:]
+        slc = self._sample_idx(log_post=log_post,
+                               is_item_specific=is_item_specific,
+                               n_sample=n_sample)
+        param_list = grid_param[slc]
+        weights = self._log_post_at(log_post=log_post, smp_idx=slc,
+                                    is_item_specific=is_item_specific)
+        if is_item_specific:
+            weights = np.sum(weights, axis=1)
 
-        n_pres = np.zeros(self.n_item)
-        last_pres = np.zeros(self.n_item)
-        for i, item in enumerate(current_seen_item):
-            is_item = hist == item
-            n_pres[item] = np.sum(is_item)
-            last_pres[item] = np.max(self.review_ts[is_item])
+        return param_list, weights
 
-        return future_ts, n_pres, last_pres
+    @staticmethod
+    def _log_cover(log_post, smp_idx, is_item_specific):
+        """
+        Log-posterior mass at the (distinct) grid points of the
+        particles, averaged over the items if item specific
+        """
+        if is_item_specific:
+            n_item = log_post.shape[0]
+            at_smp = np.zeros(log_post.shape, dtype=bool)
+            at_smp[np.arange(n_item), smp_idx] = True
+            return np.mean(logsumexp(np.where(at_smp, log_post, -np.inf),
+                                     axis=1))
+        return logsumexp(log_post[np.unique(smp_idx)])
+
+    def _draw(self, log_post, is_item_specific, n_sample):
+        """Grid indices of `n_sample` fresh samples and their log-posterior"""
+        smp_idx = self._sample_idx(log_post=log_post,
+                                   is_item_specific=is_item_specific,
+                                   n_sample=n_sample)
+        return smp_idx, self._log_post_at(log_post=log_post, smp_idx=smp_idx,
+                                          is_item_specific=is_item_specific)
+
+    def _update_param_samples(self, log_post, is_item_specific):
+        """
+        Draw a fresh set of particles, or, if reused, reweight the ones
+        drawn at previous asks by the ratio of the current posterior to
+        the one they were weighted with, and replace the oldest
+        `refresh` share of them by fresh draws. All of them are drawn
+        again if they no longer represent the posterior: effective
+        sample size too low, or the posterior moved away from them
+        """
+        n_refresh = int(np.ceil(self.refresh * self.n_sample))
+
+        if self.reuse_samples and self.smp_idx is not None:
+            lp = self._log_post_at(log_post=log_post, smp_idx=self.smp_idx,
+                                   is_item_specific=is_item_specific)
+            inc = lp - self.smp_log_post
+            if is_item_specific:
+                inc = np.sum(inc, axis=1)
+
+            log_w = self.smp_log_w + inc
+            log_w -= logsumexp(log_w)
+            ess = 1 / np.sum(np.exp(2 * log_w))
+
+            log_cover = self._log_cover(log_post=log_post,
+                                        smp_idx=self.smp_idx,
+                                        is_item_specific=is_item_specific)
+
+            if ess >= self.ess_threshold * self.n_sample \
+                    and log_cover >= self.smp_log_cover \
+                    + self.log_cover_threshold:
+
+                self.smp_log_post = lp
+                self.smp_age += 1
+
+                # The fresh draws, of weight 1 / n_sample, replace the
+                # oldest particles; the others share the rest
+                old = np.argsort(-self.smp_age, kind="stable")[:n_refresh]
+                keep = np.ones(self.n_sample, dtype=bool)
+                keep[old] = False
+                log_w[keep] += np.log(np.sum(keep) / self.n_sample) \
+                    - logsumexp(log_w[keep])
+                log_w[old] = -np.log(self.n_sample)
+
+                self.smp_idx[old], self.smp_log_post[old] = self._draw(
+                    log_post=log_post, is_item_specific=is_item_specific,
+                    n_sample=n_refresh)
+                self.smp_log_w = log_w
+                self.smp_age[old] = 0
+                self.smp_n_learnt[old] = self.n_item
+                self.smp_log_cover = self._log_cover(
+                    log_post=log_post, smp_idx=self.smp_idx,
+                    is_item_specific=is_item_specific)
+                return
+
+        self.smp_idx, self.smp_log_post = self._draw(
+            log_post=log_post, is_item_specific=is_item_specific,
+            n_sample=self.n_sample)
+        self.smp_log_w = np.full(self.n_sample, -np.log(self.n_sample))
+        self.smp_age = np.zeros(self.n_sample, dtype=int)
+        self.smp_log_cover = self._log_cover(
+            log_post=log_post, smp_idx=self.smp_idx,
+            is_item_specific=is_item_specific)
+        self.smp_n_learnt = np.full(self.n_sample, self.n_item)
 
     def ask(self, psy):
 
-        hist = psy.learner.hist.copy()
         cst_time = psy.cst_time
-        learner_model = psy.learner.__class__
+        learner_md = psy.learner.__class__
         is_item_specific = psy.is_item_specific
         omniscient = psy.omniscient
 
-        assert learner_model == Exponential
-
-        future_ts, n_pres, last_pres = \
-            self.get_future_timestamp_n_pres_last_pres(hist)
+        end_step = window_end(current_step=psy.learner.i,
+                              n_step=len(self.review_ts),
+                              ss_n_iter=self.ss_n_iter,
+                              horizon_n_ss=self.horizon_n_ss)
+        future_ts = self.review_ts[psy.learner.i:end_step]
+        state = psy.learner.rollout_state()
+        if not is_item_specific:
+            state = self._compress(state, n_slot=len(future_ts))
 
         if omniscient:
 
             param = psy.inferred_learner_param()
-            item, expected_n_learnt = self._exp_decay(
+            item, expected_n_learnt = self._rollout(
+                learner_md=learner_md,
+                state=state,
                 is_item_specific=is_item_specific,
                 future_ts=future_ts,
                 cst_time=cst_time,
                 eval_ts=self.eval_ts,
                 param=param,
-                n_pres=n_pres,
-                last_pres=last_pres)
+                end_step=end_step)
         else:
             log_post = psy.log_post
             grid_param = psy.grid_param
 
-            param_list, p_param_list = self.create_param_samples(
-                log_post=log_post,
-                is_item_specific=is_item_specific,
-                grid_param=grid_param,
-                n_sample=self.n_sample)
+            self._update_param_samples(log_post=log_post,
+                                       is_item_specific=is_item_specific)
+
+            param_list = grid_param[self.smp_idx]
+            # Normalized importance weights (uniform for a fresh set)
+            w = np.exp(self.smp_log_w)
 
             best_items = np.zeros(self.n_sample, dtype=int)
             min_n_learnt = np.zeros(self.n_sample, dtype=int)
             for i, param in enumerate(param_list):
-                best_items[i], min_n_learnt[i] = self._exp_decay(
+                # Warm start (approximation, see __init__) from the size
+                # of the catalogue each particle could learn at the
+                # previous ask, if it was kept
+                if not self.warm_start:
+                    n_item = None
+                else:
+                    n_item = min(self.n_item, self.smp_n_learnt[i] + 1)
+
+                best_items[i], min_n_learnt[i] = self._rollout(
+                    learner_md=learner_md,
+                    state=state,
                     is_item_specific=is_item_specific,
                     future_ts=future_ts,
                     cst_time=cst_time,
                     eval_ts=self.eval_ts,
                     param=param,
-                    n_pres=n_pres,
-                    last_pres=last_pres)
+                    end_step=end_step,
+                    n_item=n_item)
+
+            self.smp_n_learnt = min_n_learnt
 
             candidates = np.unique(best_items)
             rewards = np.zeros(len(candidates))
@@ -281,26 +390,26 @@ class Robust:
                 now = future_ts[0]
                 future = future_ts[1:]
 
-                n_pres_current = n_pres.copy()
-                last_pres_current = last_pres.copy()
-
-                n_pres_current[best_it] += 1
-                last_pres_current[best_it] = now
+                state_current = self._sub_state(state, self.n_item)
+                learner_md.update_state(state_current,
+                                        item=self._row(state, best_it),
+                                        timestamp=now, cst_time=cst_time)
 
                 rewards[i] = 0
 
                 for j, param in enumerate(param_list):
 
                     r = self._cp_reward(
-                        n_pres=n_pres_current,
-                        last_pres=last_pres_current,
+                        learner_md=learner_md,
+                        state=state_current,
                         future_ts=future,
                         eval_ts=self.eval_ts,
                         cst_time=cst_time,
                         min_n_learnt=min_n_learnt[j],
                         is_item_specific=is_item_specific,
-                        param=param)
-                    rewards[i] += p_param_list[j] + np.log(r)
+                        param=param,
+                        end_step=end_step)
+                    rewards[i] += w[j] * np.log(r)
 
             item = candidates[np.argmax(rewards)]
 
@@ -0,0 +1,25 @@
+import os
+import pickle
+
+
+def save(path, state):
+    """Write `state` to `path`, replacing any previous checkpoint
+    only once it is completely written"""
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        pickle.dump(state, f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp_path, path)
+
+
+def load(path):
+    """State saved in `path`, or None if there is none"""
+    if path is None or not os.path.exists(path):
+        return None
+
+    with open(path, "rb") as f:
+        return pickle.load(f)
+
+
+def remove(path):
+    if os.path.exists(path):
+        os.remove(path)
@@ -0,0 +1,244 @@
+import datetime
+
+import numpy as np
+from tqdm import tqdm
+
+from model.learner.exponential import Exponential, ExponentialBatch
+from model.teacher.leitner import Leitner, LeitnerBatch
+from model.teacher.myopic import Myopic, MyopicBatch
+
+from run import memory
+from run.make_data_triton import run
+from run.recorder import Recorder
+from run.rng import spawn_rng
+from run.timing import Spans
+
+
+def batch_key(config):
+    """
+    Configs with the same key can be simulated in lockstep; None if
+    the config has no batched version (use `run()`)
+    """
+    if config.learner_cls != Exponential:
+        return None
+
+    if config.teacher_cls == Leitner:
+        teacher_pr = tuple(sorted(config.teacher_pr.items()))
+    elif config.teacher_cls == Myopic and config.omniscient:
+        teacher_pr = ()
+    else:
+        return None
+
+    return (config.teacher_cls.__name__, teacher_pr, config.n_item,
+            config.is_item_specific, config.n_ss, config.ss_n_iter,
+            config.time_between_ss, config.time_per_iter,
+            config.learnt_threshold, config.cst_time)
+
+
+def _run_lockstep(config_list, with_tqdm=False, summary_only=False):
+
+    cf = config_list[0]
+
+    n_agent = len(config_list)
+    n_item = cf.n_item
+    n_ss = cf.n_ss
+    ss_n_iter = cf.ss_n_iter
+    time_per_iter = cf.time_per_iter
+    time_between_ss = cf.time_between_ss
+    cst_time = cf.cst_time
+
+    learnt_threshold = cf.learnt_threshold
+
+    param = np.array([c.param for c in config_list], dtype=float)
+    agent = np.arange(n_agent)
+
+    learner = ExponentialBatch(n_agent=n_agent, n_item=n_item)
+
+    is_leitner = cf.teacher_cls == Leitner
+    if is_leitner:
+        teacher = LeitnerBatch(n_agent=n_agent, n_item=n_item,
+                               **cf.teacher_pr)
+    else:
+        teacher = MyopicBatch(n_item=n_item,
+                              learnt_threshold=cf.learnt_threshold)
+
+    # Same draws as `run()` for each agent
+    rng = [spawn_rng(seed=c.seed, agent=c.agent)[0] for c in config_list]
+
+    n_iter = n_ss * ss_n_iter
+    hist = np.zeros((n_iter, n_agent), dtype=int)
+    success = np.zeros((n_iter, n_agent), dtype=bool)
+    n_learnt = np.zeros((n_iter + 1, n_agent), dtype=int)
+    n_seen = np.zeros((n_iter + 1, n_agent), dtype=int)
+    n_learnt_before = np.zeros((n_iter, n_agent), dtype=int)
+    n_seen_before = np.zeros((n_iter, n_agent), dtype=int)
+    timestamp = np.zeros(n_iter + 1)
+    timestamp_cpt = np.zeros(n_iter + 1)
+
+    delta_end_ss_begin_ss = time_between_ss - time_per_iter * ss_n_iter
+
+    now = 0.0
+
+    item = None
+    ts = None
+    was_success = None
+
+    itr = 0
+
+    # Spans of the whole batch, shared by the recorders of its runs
+    spans = Spans()
+
+    if with_tqdm:
+        import sys
+        pbar = tqdm(total=n_iter, file=sys.stdout)
+
+    for i in range(n_ss):
+        for j in range(ss_n_iter):
+
+            if item is None and ts is None:
+                item = np.zeros(n_agent, dtype=int)
+                p = np.zeros(n_agent)
+                item_seen_before = np.zeros(n_agent, dtype=bool)
+                item_learnt_before = np.zeros(n_agent, dtype=bool)
+            else:
+                if not (summary_only and is_leitner):
+                    t0 = spans.start()
+                    p_seen, seen = learner.p_seen(param=param, now=now,
+                                                  cst_time=cst_time)
+                    spans.stop("p_seen", t0)
+                if not summary_only:
+                    n_learnt_before[itr] = np.sum(p_seen > learnt_threshold,
+                                                  axis=1)
+                    n_seen_before[itr] = np.sum(seen, axis=1)
+
+                t0 = spans.start()
+                if is_leitner:
+                    item = teacher.ask(now=now,
+                                       last_was_success=was_success,
+                                       last_time_reply=ts,
+                                       idx_last_q=item)
+                else:
+                    item = teacher.ask(p_seen=p_seen, seen=seen)
+                spans.stop("ask", t0)
+
+                p = learner.p(item=item, param=param, now=ts,
+                              cst_time=cst_time)
+
+                if not summary_only:
+                    item_seen_before = seen[agent, item]
+                    item_learnt_before = \
+                        item_seen_before \
+                        & (p_seen[agent, item] > learnt_threshold)
+
+            ts = now
+            was_success = np.array([r.random() for r in rng]) < p
+
+            t0 = spans.start()
+            learner.update(item=item, timestamp=ts)
+            spans.stop("psy_update", t0)
+
+            if summary_only:
+                if j == ss_n_iter - 1:
+                    p_seen, seen = learner.p_seen(param=param, now=now,
+                                                  cst_time=cst_time)
+                    is_learnt = p_seen > learnt_threshold
+                    is_learnt[agent, item] = learner.p(
+                        item=item, param=param, now=now,
+                        cst_time=cst_time) > learnt_threshold
+                    n_learnt[itr] = np.sum(is_learnt, axis=1)
+                    n_seen[itr] = np.sum(seen, axis=1)
+            else:
+                # Only the presented item changed, as in `run()`
+                n_learnt[itr] = n_learnt_before[itr] - item_learnt_before \
+                    + (learner.p(item=item, param=param, now=now,
+                                 cst_time=cst_time) > learnt_threshold)
+                n_seen[itr] = n_seen_before[itr] + ~item_seen_before
+
+            hist[itr] = item
+            success[itr] = was_success
+            timestamp[itr] = now
+            timestamp_cpt[itr] = datetime.datetime.now().timestamp()
+
+            now += time_per_iter
+            itr += 1
+
+            if with_tqdm:
+                pbar.update()
+
+        now += delta_end_ss_begin_ss
+
+    if with_tqdm:
+        pbar.close()
+
+    p_seen, seen = learner.p_seen(param=param, now=now, cst_time=cst_time)
+    n_learnt[itr] = np.sum(p_seen > learnt_threshold, axis=1)
+    n_seen[itr] = np.sum(seen, axis=1)
+
+    timestamp[itr] = now
+    timestamp_cpt[itr] = datetime.datetime.now().timestamp()
+
+    ss_idx = np.append(np.repeat(np.arange(n_ss), ss_n_iter), n_ss)
+    ss_iter = np.append(np.tile(np.arange(ss_n_iter), n_ss), ss_n_iter)
+
+    # Rows recorded: every iteration, or the last of each session,
+    # and the evaluation
+    if summary_only:
+        row = np.append(np.arange(1, n_ss + 1) * ss_n_iter - 1, n_iter)
+    else:
+        row = np.arange(n_iter + 1)
+
+    recorder_list = []
+    for a, config in enumerate(config_list):
+        recorder = Recorder(n_row=len(row),
+                            config_file=config.config_file,
+                            config_dic=config.config_dic)
+        recorder.col["iter"][:] = row
+        recorder.col["item"][:] = np.append(hist[:, a], hist[-1, a])[row]
+        recorder.col["success"][:] = np.append(success[:, a],
+                                               success[-1, a])[row]
+        recorder.col["ss_idx"][:] = ss_idx[row]
+        recorder.col["ss_iter"][:] = ss_iter[row]
+        recorder.col["n_learnt"][:] = n_learnt[row, a]
+        recorder.col["n_seen"][:] = n_seen[row, a]
+        if not summary_only:
+            recorder.col["n_learnt_before"][:-1] = n_learnt_before[:, a]
+            recorder.col["n_seen_before"][:-1] = n_seen_before[:, a]
+        recorder.col["timestamp"][:] = timestamp[row]
+        recorder.col["timestamp_cpt"][:] = timestamp_cpt[row]
+        recorder.i = len(row)
+
+        # The learner and teacher are the ones of the whole batch (no
+        # psychologist: the batched runs use the true parameters)
+        recorder.timing = spans
+        recorder.memory = memory.report(learner=learner, psy=None,
+                                        teacher=teacher, recorder=recorder)
+
+        recorder_list.append(recorder)
+
+    return recorder_list
+
+
+def run_batch(config_list, with_tqdm=False, summary_only=False):
+    """
+    Same as `run()` for every config of `config_list`, simulating
+    the ones that share a batch key in lockstep.
+    Return the recorders, in the order of `config_list`
+    """
+    group = {}
+    for k, config in enumerate(config_list):
+        group.setdefault(batch_key(config), []).append(k)
+
+    recorder_list = [None] * len(config_list)
+    for key, idx in group.items():
+        if key is None:
+            for k in idx:
+                recorder_list[k] = run(config_list[k], with_tqdm=with_tqdm,
+                                       summary_only=summary_only)
+        else:
+            batch = _run_lockstep([config_list[k] for k in idx],
+                                  with_tqdm=with_tqdm,
+                                  summary_only=summary_only)
+            for k, recorder in zip(idx, batch):
+                recorder_list[k] = recorder
+
+    return recorder_list
@@ -0,0 +1,69 @@
+import numpy as np
+
+from model.learner.exponential import ExponentialBatch
+from model.teacher.leitner import LeitnerBatch
+from run.rng import spawn_rng
+
+
+def run_leitner(param, n_item, teacher_pr, n_ss, ss_n_iter,
+                time_between_ss, time_per_iter, learnt_threshold,
+                cst_time, seed, agent=0):
+    """
+    Simulate one omniscient Leitner/Exponential run per row of `param`
+    (n_agent x 2) in lockstep, following the same steps as `run()`
+    with the same seed and agent for every row.
+
+    Return the number of items learnt at the end of the last session
+    and at evaluation (both of shape n_agent)
+    """
+    param = np.asarray(param)
+    n_agent = len(param)
+
+    teacher = LeitnerBatch(n_agent=n_agent, n_item=n_item, **teacher_pr)
+    learner = ExponentialBatch(n_agent=n_agent, n_item=n_item)
+
+    delta_end_ss_begin_ss = time_between_ss - time_per_iter * ss_n_iter
+
+    rng, _ = spawn_rng(seed=seed, agent=agent)
+
+    now = 0.0
+
+    item = None
+    ts = None
+    was_success = None
+
+    n_learnt_end_ss = None
+
+    for i in range(n_ss):
+        for j in range(ss_n_iter):
+
+            if item is None and ts is None:
+                item = np.zeros(n_agent, dtype=int)
+                p = np.zeros(n_agent)
+            else:
+                item = teacher.ask(now=now,
+                                   last_was_success=was_success,
+                                   last_time_reply=ts,
+                                   idx_last_q=item)
+
+                p = learner.p(item=item, param=param, now=ts,
+                              cst_time=cst_time)
+
+            ts = now
+            was_success = rng.random() < p
+
+            learner.update(item=item, timestamp=ts)
+
+            if i == n_ss - 1 and j == ss_n_iter - 1:
+                p_seen, seen = learner.p_seen(param=param, now=now,
+                                              cst_time=cst_time)
+                n_learnt_end_ss = np.sum(p_seen > learnt_threshold, axis=1)
+
+            now += time_per_iter
+
+        now += delta_end_ss_begin_ss
+
+    p_seen, seen = learner.p_seen(param=param, now=now, cst_time=cst_time)
+    n_learnt = np.sum(p_seen > learnt_threshold, axis=1)
+
+    return n_learnt_end_ss, n_learnt
@@ -1,26 +1,30 @@
 import numpy as np
 import datetime
-import pandas as pd
+import time
 from tqdm import tqdm
 
 from model.teacher.leitner import Leitner
 from model.teacher.myopic import Myopic
 from model.teacher.conservative import Conservative
 from model.teacher.robust import Robust
+from model.teacher.info_gain import InfoGain
 
 from model.psychologist.psychologist_grid import PsyGrid
 
 from model.learner.walsh2018 import Walsh2018
 from model.learner.exponential import Exponential
 
+from run.recorder import Recorder
+from run import checkpoint
+from run import memory
+from run.rng import spawn_rng, ReplyDraws
 
-def run(config, with_tqdm=False):
+
+def make_models(config, teacher_rng=None):
+    """Teacher, learner and psychologist of a run, before any iteration"""
 
     n_item = config.n_item
     omniscient = config.omniscient
-    config_file = config.config_file
-    config_dic = config.config_dic
-    seed = config.seed
     n_ss = config.n_ss
     ss_n_iter = config.ss_n_iter
     time_between_ss = config.time_between_ss
@@ -39,6 +43,9 @@ def run(config, with_tqdm=False):
 
     bounds = config.bounds
 
+    if teacher_cls == Robust:
+        teacher_pr = {"rng": teacher_rng, **teacher_pr}
+
     if teacher_cls == Leitner:
         teacher = teacher_cls(n_item=n_item, **teacher_pr)
 
@@ -46,28 +53,35 @@ def run(config, with_tqdm=False):
         teacher = teacher_cls(n_item=n_item,
                               learnt_threshold=learnt_threshold)
 
+    elif teacher_cls == InfoGain:
+        teacher = teacher_cls(n_item=n_item,
+                              learnt_threshold=learnt_threshold,
+                              **teacher_pr)
+
     elif teacher_cls in (Conservative, Robust):
         teacher = teacher_cls(n_item=n_item,
                               learnt_threshold=learnt_threshold,
                               time_per_iter=time_per_iter,
                               n_ss=n_ss,
                               ss_n_iter=ss_n_iter,
-                              time_between_ss=time_between_ss)
+                              time_between_ss=time_between_ss,
+                              **teacher_pr)
 
     else:
         raise ValueError(f"{teacher_cls} not recognized")
 
-    is_leitner = teacher_cls == Leitner
-    is_myopic = teacher_cls == Myopic
-
 
-    if learner_cls in (Walsh2018, Exponential):
+    if learner_cls == Exponential:
         learner = learner_cls(n_item=n_item,
                               n_iter=n_ss * ss_n_iter)
+    elif learner_cls == Walsh2018:
+        learner = learner_cls(n_item=n_item,
+                              n_iter=n_ss * ss_n_iter,
+                              cst_time=cst_time)
     else:
         raise ValueError
 
-    if omniscient or is_leitner:
+    if omniscient or teacher_cls == Leitner:
         psy = PsyGrid(
             n_item=n_item,
             is_item_specific=is_item_specific,
@@ -86,106 +100,252 @@ def run(config, with_tqdm=False):
             cst_time=cst_time,
             **psy_pr)
 
+    return teacher, learner, psy
+
+
+def run(config, with_tqdm=False, lean=False, pr_inf_every=None,
+        checkpoint_file=None, checkpoint_every=None,
+        per_item_draws=False, antithetic=False, summary_only=False):
+    """
+    In lean mode only the events (item, success, timestamp) are
+    recorded, plus the inferred parameter every `pr_inf_every`
+    iterations if given; the other metrics can be computed afterwards
+    with `run.metrics.add_metrics`.
+
+    If `checkpoint_file` exists, the run resumes from it; the state is
+    saved to it every `checkpoint_every` seconds (wall-clock time).
+    Both are given, or neither.
+
+    `per_item_draws` and `antithetic` set how the replies are drawn
+    (see `run.rng.ReplyDraws`).
+
+    With `summary_only`, only the last iteration of each session and
+    the evaluation are recorded, with n_learnt and n_seen
+    """
+    if (checkpoint_file is None) != (checkpoint_every is None):
+        raise ValueError("checkpoint_file and checkpoint_every must be "
+                         "given together")
+
+    n_item = config.n_item
+    omniscient = config.omniscient
+    config_file = config.config_file
+    config_dic = config.config_dic
+    seed = config.seed
+    agent = config.agent
+    n_ss = config.n_ss
+    ss_n_iter = config.ss_n_iter
+    time_between_ss = config.time_between_ss
+    time_per_iter = config.time_per_iter
+    learnt_threshold = config.learnt_threshold
+
+    pr = config.param
+
+    teacher_cls = config.teacher_cls
+
+    rng, teacher_rng = spawn_rng(seed=seed, agent=agent)
+    draws = ReplyDraws(rng=rng, n_item=n_item, per_item=per_item_draws,
+                       antithetic=antithetic)
+
+    teacher, learner, psy = make_models(config, teacher_rng=teacher_rng)
+
+    is_leitner = teacher_cls == Leitner
+    is_myopic = teacher_cls == Myopic
+    is_info_gain = teacher_cls == InfoGain
+
     delta_end_ss_begin_ss = time_between_ss - time_per_iter * ss_n_iter
 
-    np.random.seed(seed)
+    # The metrics of each iteration are not computed in lean and summary
+    # modes
+    skip_metrics = lean or summary_only
+    if summary_only:
+        pr_inf_every = None
+
+    recorder = Recorder(n_row=n_ss + 1 if summary_only
+                        else n_ss * ss_n_iter + 1,
+                        config_file=config_file,
+                        config_dic=config_dic)
+
+    ckpt = checkpoint.load(checkpoint_file)
+
+    if ckpt is None:
+        now = 0.0
+
+        item = None
+        ts = None
+        was_success = None
 
-    row_list = []
+        itr = 0
 
-    now = 0.0
+    else:
+        if ckpt["config_hash"] != recorder.meta["config_hash"]:
+            raise ValueError(f"{checkpoint_file} is not from this config")
+
+        teacher = ckpt["teacher"]
+        psy = ckpt["psy"]
+        recorder = ckpt["recorder"]
+        draws = ckpt["draws"]
 
-    item = None
-    ts = None
-    was_success = None
+        now = ckpt["now"]
+        item = ckpt["item"]
+        ts = ckpt["ts"]
+        was_success = ckpt["was_success"]
+        itr = ckpt["itr"]
 
-    itr = 0
+    spans = recorder.timing
+
+    last_ckpt = time.time()
 
     if with_tqdm:
         import sys
         n_iter = n_ss * ss_n_iter
-        pbar = tqdm(total=n_iter, file=sys.stdout)
-
-    for i in range(n_ss):
-        for j in range(ss_n_iter):
+        pbar = tqdm(total=n_iter, initial=itr, file=sys.stdout)
+
+    start_ss, start_iter = divmod(itr, ss_n_iter)
+
+    for i in range(start_ss, n_ss):
+        for j in range(start_iter if i == start_ss else 0, ss_n_iter):
+
+            if checkpoint_every is not None \
+                    and time.time() - last_ckpt >= checkpoint_every:
+                checkpoint.save(checkpoint_file, {
+                    "config_hash": recorder.meta["config_hash"],
+                    "teacher": teacher,
+                    "psy": psy,
+                    "recorder": recorder,
+                    "draws": draws,
+                    "now": now,
+                    "item": item,
+                    "ts": ts,
+                    "was_success": was_success,
+                    "itr": itr})
+                last_ckpt = time.time()
 
             if item is None and ts is None:
                 item = 0
                 p = 0
                 n_learnt_before = 0
                 n_seen_before = 0
+                item_seen_before = False
+                item_learnt_before = False
 
                 pr_inf, p_err_mean, p_err_std = None, None, None
                 p_err_raw_mean, p_err_raw_std = None, None
             else:
 
-                p_seen_real_before, seen_before = psy.p_seen(now=now, param=pr)
-                n_learnt_before = np.sum(p_seen_real_before > learnt_threshold)
-                n_seen_before = np.sum(seen_before)
+                if not skip_metrics:
+                    t0 = spans.start()
+                    p_seen_real_before, seen_before = psy.p_seen(now=now,
+                                                                 param=pr)
+                    spans.stop("p_seen", t0)
+                    n_learnt_before = np.sum(p_seen_real_before
+                                             > learnt_threshold)
+                    n_seen_before = np.sum(seen_before)
 
-                if is_leitner or omniscient:
-                    pr_inf, p_err_mean, p_err_std = None, None, None
-                    p_err_raw_mean, p_err_raw_std = None, None
+                pr_inf, p_err_mean, p_err_std = None, None, None
+                p_err_raw_mean, p_err_raw_std = None, None
 
-                else:
+                if not (is_leitner or omniscient):
+                    # Also needed when skipping the metrics: it updates
+                    # the estimate of the items not repeated yet
+                    t0 = spans.start()
                     pr_inf = psy.inferred_learner_param()
-                    p_seen_inf, seen = psy.p_seen(now=now,
-                                                  param=pr_inf)
-
-                    p_err = np.abs(p_seen_real_before - p_seen_inf)
-                    p_err_mean, p_err_std = np.mean(p_err), np.std(p_err)
-
-                    p_err_raw = p_seen_inf - p_seen_real_before
-                    p_err_raw_mean, p_err_raw_std = \
-                        np.mean(p_err_raw), np.std(p_err_raw)
-
+                    spans.stop("inferred_learner_param", t0)
+
+                    if not skip_metrics:
+                        t0 = spans.start()
+                        p_seen_inf, seen = psy.p_seen(now=now,
+                                                      param=pr_inf)
+                        spans.stop("p_seen", t0)
+
+                        p_err = np.abs(p_seen_real_before - p_seen_inf)
+                        p_err_mean, p_err_std = \
+                            np.mean(p_err), np.std(p_err)
+
+                        p_err_raw = p_seen_inf - p_seen_real_before
+                        p_err_raw_mean, p_err_raw_std = \
+                            np.mean(p_err_raw), np.std(p_err_raw)
+
+                    # Copy, as the estimate is updated in place
+                    if not skip_metrics or pr_inf_every is not None \
+                            and itr % pr_inf_every == 0:
+                        pr_inf = np.copy(pr_inf)
+                    else:
+                        pr_inf = None
+
+                t0 = spans.start()
                 if is_leitner:
                     item = teacher.ask(now=now,
                                        last_was_success=was_success,
                                        last_time_reply=ts,
                                        idx_last_q=item)
 
-                elif is_myopic:
+                elif is_myopic or is_info_gain:
                     item = teacher.ask(now=now, psy=psy)
 
                 else:
                     item = teacher.ask(psy=psy)
+                spans.stop("ask", t0)
 
                 p = psy.p(item=item, param=pr, now=ts)
 
+                if not skip_metrics:
+                    item_seen_before = seen_before[item]
+                    item_learnt_before = item_seen_before and \
+                        p_seen_real_before[
+                            np.count_nonzero(seen_before[:item])] \
+                        > learnt_threshold
+
             ts = now
-            was_success = np.random.random() < p
+            was_success = draws.draw(item) < p
 
+            t0 = spans.start()
             psy.update(item=item, response=was_success, timestamp=ts)
-
-            p_seen_real, seen = psy.p_seen(now=now, param=pr)
-
-            n_learnt = np.sum(p_seen_real > learnt_threshold)
-            n_seen = np.sum(seen)
-
-            now_real = datetime.datetime.now().timestamp()
-
-            row = {
-                "iter": itr,
-                "item": item,
-                "success": was_success,
-                "ss_idx": i,
-                "ss_iter": j,
-                "pr_inf": pr_inf,
-                "p_err_mean": p_err_mean,
-                "p_err_std": p_err_std,
-                "p_err_raw_mean": p_err_raw_mean,
-                "p_err_raw_std": p_err_raw_std,
-                "n_learnt_before": n_learnt_before,
-                "n_learnt": n_learnt,
-                "n_seen_before": n_seen_before,
-                "n_seen": n_seen,
-                "timestamp": now,
-                "timestamp_cpt": now_real,
-                "config_file": config_file,
-                "is_human": False,
-                **config_dic
-            }
-            row_list.append(row)
+            spans.stop("psy_update", t0)
+
+            if summary_only and j == ss_n_iter - 1:
+                p_seen_real, seen = psy.p_seen(now=now, param=pr)
+                is_learnt = p_seen_real > learnt_threshold
+                # As in the other modes, the recall of the presented
+                # item is the one of `psy.p`
+                is_learnt[np.count_nonzero(seen[:item])] = \
+                    psy.p(item=item, param=pr, now=now) > learnt_threshold
+                n_learnt = np.sum(is_learnt)
+                n_seen = np.sum(seen)
+                n_learnt_before, n_seen_before = None, None
+
+            elif skip_metrics:
+                n_learnt, n_seen = None, None
+                n_learnt_before, n_seen_before = None, None
+            else:
+                # Only the presented item changed since the recall was
+                # evaluated before the update, at the same time
+                n_learnt = n_learnt_before - item_learnt_before \
+                    + (psy.p(item=item, param=pr, now=now)
+                       > learnt_threshold)
+                n_seen = n_seen_before + (not item_seen_before)
+
+            if not summary_only or j == ss_n_iter - 1:
+                now_real = datetime.datetime.now().timestamp()
+
+                t0 = spans.start()
+                recorder.record(
+                    iter=itr,
+                    item=item,
+                    success=was_success,
+                    ss_idx=i,
+                    ss_iter=j,
+                    pr_inf=pr_inf,
+                    p_err_mean=p_err_mean,
+                    p_err_std=p_err_std,
+                    p_err_raw_mean=p_err_raw_mean,
+                    p_err_raw_std=p_err_raw_std,
+                    n_learnt_before=n_learnt_before,
+                    n_learnt=n_learnt,
+                    n_seen_before=n_seen_before,
+                    n_seen=n_seen,
+                    timestamp=now,
+                    timestamp_cpt=now_real)
+                spans.stop("record", t0)
 
             now += time_per_iter
             itr += 1
@@ -195,37 +355,32 @@ def run(config, with_tqdm=False):
 
         now += delta_end_ss_begin_ss
 
-    p_seen_real, seen = psy.p_seen(now=now, param=pr)
+    if lean:
+        n_learnt, n_seen = None, None
+    else:
+        p_seen_real, seen = psy.p_seen(now=now, param=pr)
 
-    n_learnt = np.sum(p_seen_real > learnt_threshold)
-    n_seen = np.sum(seen)
+        n_learnt = np.sum(p_seen_real > learnt_threshold)
+        n_seen = np.sum(seen)
 
     if with_tqdm:
         pbar.close()
         print()
         print("now", now, "n_learnt", n_learnt, "n_seen", n_seen)
 
-    row = {
-        "iter": itr,
-        "item": item,
-        "success": was_success,
-        "ss_idx": n_ss,
-        "ss_iter": ss_n_iter,
-        "pr_inf": None,
-        "p_err_mean": None,
-        "p_err_std": None,
-        "p_err_raw_mean": None,
-        "p_err_raw_std": None,
-        "n_learnt_before": None,
-        "n_learnt": n_learnt,
-        "n_seen_before": None,
-        "n_seen": n_seen,
-        "timestamp": now,
-        "timestamp_cpt": datetime.datetime.now().timestamp(),
-        "config_file": config_file,
-        "is_human": False,
-        **config_dic
-    }
-    row_list.append(row)
-
-    return pd.DataFrame(row_list)
+    # After a resume, `learner` is not the one of the restored `psy`
+    recorder.memory = memory.report(learner=psy.learner, psy=psy,
+                                    teacher=teacher, recorder=recorder)
+
+    recorder.record(
+        iter=itr,
+        item=item,
+        success=was_success,
+        ss_idx=n_ss,
+        ss_iter=ss_n_iter,
+        n_learnt=n_learnt,
+        n_seen=n_seen,
+        timestamp=now,
+        timestamp_cpt=datetime.datetime.now().timestamp())
+
+    return recorder
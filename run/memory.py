@@ -0,0 +1,128 @@
+"""
+Memory held by the models of a run, per component, and the peak of
+the process. Run as a script for a dry-run estimate from config files:
+
+    python -m run.memory [config files (default: the configs of the sweep,
+                          config/triton/sweep.json)]
+"""
+
+import sys
+import types
+import resource
+
+import numpy as np
+
+from run.recorder import Recorder
+from model.teacher.leitner import Leitner
+
+import settings.paths as paths
+from settings.config_triton import Config
+from settings.sweep import Sweep
+
+
+def nbytes(obj, seen=None):
+    """
+    Bytes held by `obj`: its arrays, containers and attributes,
+    recursively; objects whose id is in `seen` are not counted (again)
+    """
+    if seen is None:
+        seen = set()
+    if id(obj) in seen:
+        return 0
+    seen.add(id(obj))
+
+    if isinstance(obj, np.ndarray):
+        return obj.nbytes
+
+    if isinstance(obj, dict):
+        return sys.getsizeof(obj) + sum(
+            nbytes(k, seen) + nbytes(v, seen) for k, v in obj.items())
+
+    if isinstance(obj, (list, tuple, set, frozenset)):
+        return sys.getsizeof(obj) + sum(nbytes(x, seen) for x in obj)
+
+    if hasattr(obj, "__dict__") and not isinstance(
+            obj, (type, types.ModuleType, types.FunctionType)):
+        return sys.getsizeof(obj) + nbytes(vars(obj), seen)
+
+    return sys.getsizeof(obj)
+
+
+def peak_rss():
+    """Peak resident memory of the process so far (bytes)"""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # kB on Linux, bytes on macOS
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def report(learner, psy, teacher, recorder):
+    """
+    Bytes held by each component (the psychologist without the learner
+    it holds), and the peak of the process, which also counts the
+    transient arrays (e.g. the rollouts of the teacher) and, in a pool
+    of workers, the previous runs of the same process
+    """
+    seen = set()
+    res = {
+        "learner": nbytes(learner, seen),
+        "psy": nbytes(psy, seen),
+        "teacher": nbytes(teacher, seen),
+        "recorder": nbytes(recorder, seen)}
+    res["peak_rss"] = peak_rss()
+    return res
+
+
+def estimate(config, baseline=None):
+    """
+    Dry-run estimate of the memory of a run of `config`: the models
+    are built but not run. Their arrays are preallocated to the length
+    of the run, except the inferred parameters of the recorder, counted
+    here; the transient arrays of the teacher are not included.
+    `baseline` is the process before building anything (interpreter and
+    imported modules), measured now if not given
+    """
+    from run.make_data_triton import make_models
+
+    if baseline is None:
+        baseline = peak_rss()
+
+    teacher, learner, psy = make_models(
+        config, teacher_rng=np.random.default_rng())
+    n_row = config.n_ss * config.ss_n_iter + 1
+    recorder = Recorder(n_row=n_row, config_file=config.config_file,
+                        config_dic=config.config_dic)
+
+    res = report(learner=learner, psy=psy, teacher=teacher,
+                 recorder=recorder)
+    del res["peak_rss"]
+
+    if not (config.omniscient or config.teacher_cls == Leitner):
+        res["recorder"] += n_row * np.asarray(psy.est_param).nbytes
+
+    res["baseline"] = baseline
+    res["total"] = sum(res.values())
+    return res
+
+
+def main(files):
+
+    if files:
+        configs = (Config.get(f) for f in files)
+    else:
+        configs = Sweep.load(paths.SWEEP_FILE).configs()
+
+    baseline = peak_rss()
+
+    mb = 1024 ** 2
+    total = []
+    for config in configs:
+        res = estimate(config, baseline=baseline)
+        total.append(res["total"])
+        print(config.config_file, " ".join(
+            f"{k}={v / mb:.1f}MB" for k, v in res.items()))
+
+    print(f"Max total: {max(total) / mb:.1f}MB")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
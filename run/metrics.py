@@ -0,0 +1,226 @@
+"""
+Metrics of a run computed after the fact from its event log (see the
+lean mode of `run.make_data_triton.run`): for all the iterations at once
+for the Exponential learner, by replaying the log for the others
+"""
+
+import numpy as np
+
+from model.learner.exponential import Exponential
+from model.learner.walsh2018 import Walsh2018
+
+# Number of (evaluation, item) recall values computed at once
+CHUNK_SIZE = 2**22
+
+
+def _p_seen(n_pres, last_pres, now, init_forget, rep_effect, cst_time):
+    """Recall of every item at each evaluation (rows), NaN if unseen"""
+    fr = init_forget * (1 - rep_effect) ** (n_pres - 1)
+
+    delta = now[:, None] - last_pres
+    delta *= cst_time
+    with np.errstate(divide="ignore", invalid="ignore", over="ignore"):
+        p = np.exp(-fr * delta)
+
+    p[n_pres == 0] = np.nan
+    return p
+
+
+def _split_param(param, is_item_specific):
+
+    if is_item_specific:
+        return param[..., 0], param[..., 1]
+    return param[..., 0:1], param[..., 1:2]
+
+
+def cp_metrics(item, timestamp, n_item, param, is_item_specific,
+               learnt_threshold, cst_time, pr_inf=None):
+    """
+    Metrics of `run` from its log: `item` and `timestamp` of each
+    of the n iterations, then the time of the final evaluation.
+    If given, `pr_inf` holds the inferred parameter at each iteration
+    (NaN where not recorded), used for the error on the recall.
+
+    Returns the metric columns, of length n + 1 (NaN where `run`
+    records no value)
+    """
+    n_iter = len(item)
+    n_row = n_iter + 1
+    item = np.asarray(item, dtype=int)
+    timestamp = np.asarray(timestamp, dtype=float)
+
+    init_forget, rep_effect = _split_param(np.asarray(param),
+                                           is_item_specific)
+
+    col = {k: np.full(n_row, np.nan) for k in (
+        "n_learnt_before", "n_learnt", "n_seen_before", "n_seen",
+        "p_err_mean", "p_err_std", "p_err_raw_mean", "p_err_raw_std")}
+
+    has_pr_inf = np.zeros(n_row, dtype=bool)
+    if pr_inf is not None:
+        has_pr_inf[:len(pr_inf)] = ~np.all(
+            np.isnan(pr_inf.reshape(len(pr_inf), -1)), axis=1)
+
+    # State after the updates preceding the chunk
+    n_pres = np.zeros(n_item, dtype=int)
+    last_pres = np.zeros(n_item)
+
+    chunk = max(1, CHUNK_SIZE // n_item)
+
+    for start in range(0, n_iter, chunk):
+
+        end = min(n_iter, start + chunk)
+        k = np.arange(start, end)
+        now = timestamp[start:end]
+
+        is_item = np.zeros((end - start, n_item), dtype=bool)
+        is_item[np.arange(end - start), item[start:end]] = True
+
+        # State after (`_after`) and before (`_before`) the update of
+        # each iteration
+        n_pres_after = n_pres + np.cumsum(is_item, axis=0)
+        n_pres_before = n_pres_after - is_item
+
+        last_pres_after = np.maximum.accumulate(
+            np.vstack((last_pres, np.where(is_item, now[:, None], 0))),
+            axis=0)
+        last_pres_before = last_pres_after[:-1]
+        last_pres_after = last_pres_after[1:]
+
+        p_before = _p_seen(n_pres_before, last_pres_before, now,
+                           init_forget, rep_effect, cst_time)
+        p_after = _p_seen(n_pres_after, last_pres_after, now,
+                          init_forget, rep_effect, cst_time)
+
+        col["n_learnt_before"][k] = np.sum(p_before > learnt_threshold,
+                                           axis=1)
+        col["n_seen_before"][k] = np.sum(n_pres_before > 0, axis=1)
+        col["n_learnt"][k] = np.sum(p_after > learnt_threshold, axis=1)
+        col["n_seen"][k] = np.sum(n_pres_after > 0, axis=1)
+
+        inf = has_pr_inf[start:end] & (k > 0)
+        if np.any(inf):
+            inf_init_forget, inf_rep_effect = _split_param(
+                pr_inf[k[inf]], is_item_specific)
+            p_inf = _p_seen(n_pres_before[inf], last_pres_before[inf],
+                            now[inf], inf_init_forget, inf_rep_effect,
+                            cst_time)
+            p_err_raw = p_inf - p_before[inf]
+            p_err = np.abs(p_err_raw)
+            col["p_err_mean"][k[inf]] = np.nanmean(p_err, axis=1)
+            col["p_err_std"][k[inf]] = np.nanstd(p_err, axis=1)
+            col["p_err_raw_mean"][k[inf]] = np.nanmean(p_err_raw, axis=1)
+            col["p_err_raw_std"][k[inf]] = np.nanstd(p_err_raw, axis=1)
+
+        n_pres = n_pres_after[-1]
+        last_pres = last_pres_after[-1]
+
+    # Nothing is seen before the first iteration
+    col["n_learnt_before"][0] = 0
+    col["n_seen_before"][0] = 0
+
+    p_end = _p_seen(n_pres[None], last_pres[None], timestamp[n_iter:],
+                    init_forget, rep_effect, cst_time)
+    col["n_learnt"][n_iter] = np.sum(p_end > learnt_threshold)
+    col["n_seen"][n_iter] = np.sum(n_pres > 0)
+
+    return col
+
+
+def cp_metrics_replay(learner, item, timestamp, param, is_item_specific,
+                      learnt_threshold, cst_time, pr_inf=None):
+    """
+    Same as `cp_metrics` for any learner: the log is replayed on
+    `learner` (new), one iteration at a time as in `run`
+    """
+    n_iter = len(item)
+    n_row = n_iter + 1
+    item = np.asarray(item, dtype=int)
+    timestamp = np.asarray(timestamp, dtype=float)
+
+    col = {k: np.full(n_row, np.nan) for k in (
+        "n_learnt_before", "n_learnt", "n_seen_before", "n_seen",
+        "p_err_mean", "p_err_std", "p_err_raw_mean", "p_err_raw_std")}
+
+    has_pr_inf = np.zeros(n_row, dtype=bool)
+    if pr_inf is not None:
+        has_pr_inf[:len(pr_inf)] = ~np.all(
+            np.isnan(pr_inf.reshape(len(pr_inf), -1)), axis=1)
+
+    def p_seen(now, pr):
+        return learner.p_seen(param=pr,
+                              is_item_specific=is_item_specific,
+                              now=now, cst_time=cst_time)
+
+    for k in range(n_iter):
+
+        now = timestamp[k]
+        it = item[k]
+
+        if k == 0:
+            # Nothing is seen before the first iteration
+            n_learnt_before, n_seen_before = 0, 0
+            item_seen_before = item_learnt_before = False
+        else:
+            p_before, seen = p_seen(now, param)
+            n_learnt_before = np.sum(p_before > learnt_threshold)
+            n_seen_before = np.sum(seen)
+            item_seen_before = seen[it]
+            item_learnt_before = item_seen_before and \
+                p_before[np.count_nonzero(seen[:it])] > learnt_threshold
+
+            if has_pr_inf[k]:
+                p_inf, _ = p_seen(now, pr_inf[k])
+                p_err_raw = p_inf - p_before
+                p_err = np.abs(p_err_raw)
+                col["p_err_mean"][k] = np.mean(p_err)
+                col["p_err_std"][k] = np.std(p_err)
+                col["p_err_raw_mean"][k] = np.mean(p_err_raw)
+                col["p_err_raw_std"][k] = np.std(p_err_raw)
+
+        learner.update(item=it, timestamp=now)
+
+        p = learner.p(item=it, param=param, now=now,
+                      is_item_specific=is_item_specific, cst_time=cst_time)
+
+        col["n_learnt_before"][k] = n_learnt_before
+        col["n_seen_before"][k] = n_seen_before
+        col["n_learnt"][k] = n_learnt_before - item_learnt_before \
+            + (p > learnt_threshold)
+        col["n_seen"][k] = n_seen_before + (not item_seen_before)
+
+    p_end, seen = p_seen(timestamp[n_iter], param)
+    col["n_learnt"][n_iter] = np.sum(p_end > learnt_threshold)
+    col["n_seen"][n_iter] = np.sum(seen)
+
+    return col
+
+
+def add_metrics(recorder, config):
+    """
+    Fill in the metrics of a run recorded in lean mode: at once for the
+    Exponential learner, by replaying the log on a learner otherwise
+    """
+    n = recorder.i
+    log = {
+        "item": recorder.col["item"][:n - 1],
+        "timestamp": recorder.col["timestamp"][:n],
+        "param": config.param,
+        "is_item_specific": config.is_item_specific,
+        "learnt_threshold": config.learnt_threshold,
+        "cst_time": config.cst_time,
+        "pr_inf": None if recorder.pr_inf is None else recorder.pr_inf[:n]}
+
+    if config.learner_cls == Exponential:
+        col = cp_metrics(n_item=config.n_item, **log)
+    else:
+        learner_pr = {"cst_time": config.cst_time} \
+            if config.learner_cls == Walsh2018 else {}
+        learner = config.learner_cls(n_item=config.n_item, n_iter=n - 1,
+                                     **learner_pr)
+        col = cp_metrics_replay(learner=learner, **log)
+
+    for k, v in col.items():
+        recorder.col[k][:n] = v
+
+    return recorder
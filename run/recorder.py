@@ -0,0 +1,172 @@
+import os
+import json
+import hashlib
+
+import numpy as np
+import pandas as pd
+
+from run.timing import Spans
+
+
+META_EXT = ".meta.json"
+PR_INF_EXT = ".pr_inf.npy"
+PR_INF_DELTA_EXT = ".pr_inf.npz"
+TIMING_EXT = ".timing.json"
+MEMORY_EXT = ".memory.json"
+
+
+def config_hash(config_dic):
+
+    dump = json.dumps(config_dic, sort_keys=True, default=str)
+    return hashlib.sha1(dump.encode()).hexdigest()[:16]
+
+
+def delta_encode(traj):
+    """
+    Rows of `traj` that are not all NaN, as the first one and the
+    differences between consecutive ones. The differences are taken
+    on the bits (int64 view) so that decoding is exact; the estimate
+    changes for few items per iteration, so they are mostly zeros
+    """
+    idx = np.flatnonzero(~np.all(np.isnan(traj.reshape(len(traj), -1)),
+                                 axis=1))
+    bits = np.ascontiguousarray(traj[idx]).view(np.int64)
+    return {"n_row": len(traj), "idx": idx, "delta": np.diff(bits, axis=0),
+            "first": bits[:1]}
+
+
+def delta_decode(n_row, idx, delta, first):
+
+    bits = np.cumsum(np.concatenate((first, delta)), axis=0)
+    traj = np.full((int(n_row), *first.shape[1:]), np.nan)
+    traj[idx] = bits.view(np.float64)
+    return traj
+
+
+class Recorder:
+    """
+    Per-iteration metrics of a run, in preallocated typed columns.
+    The run metadata (config) is kept once and only broadcast
+    to every row when the frame is built
+    """
+
+    # Columns in output order, and their type. Missing values
+    # are NaN for the float columns. The inferred parameter (array
+    # per row) is kept in its own (n_row, *param shape) array
+    COLUMNS = {
+        "iter": int,
+        "item": int,
+        "success": bool,
+        "ss_idx": int,
+        "ss_iter": int,
+        "pr_inf": np.ndarray,
+        "p_err_mean": float,
+        "p_err_std": float,
+        "p_err_raw_mean": float,
+        "p_err_raw_std": float,
+        "n_learnt_before": float,
+        "n_learnt": int,
+        "n_seen_before": float,
+        "n_seen": int,
+        "timestamp": float,
+        "timestamp_cpt": float,
+    }
+
+    def __init__(self, n_row, config_file, config_dic):
+
+        self.n_row = n_row
+        self.i = 0
+
+        self.meta = {
+            "config_hash": config_hash(config_dic),
+            "config_file": config_file,
+            "is_human": False,
+            **config_dic
+        }
+
+        self.col = {}
+        for k, dtype in self.COLUMNS.items():
+            if dtype == float:
+                self.col[k] = np.full(n_row, np.nan)
+            elif dtype != np.ndarray:
+                self.col[k] = np.zeros(n_row, dtype=dtype)
+
+        # Allocated at the first inferred parameter recorded
+        self.pr_inf = None
+
+        # Durations of the parts of the simulation loop
+        self.timing = Spans()
+
+        # Bytes held per component at the end of the run
+        # (see `run.memory.report`)
+        self.memory = None
+
+    def record(self, pr_inf=None, **kwargs):
+
+        i = self.i
+        if pr_inf is not None:
+            if self.pr_inf is None:
+                self.pr_inf = np.full((self.n_row, *np.shape(pr_inf)),
+                                      np.nan)
+            self.pr_inf[i] = pr_inf
+
+        for k, v in kwargs.items():
+            if v is not None:
+                self.col[k][i] = v
+        self.i += 1
+
+    def _pr_inf_list(self, n):
+
+        if self.pr_inf is None:
+            return [None] * n
+        return [None if np.all(np.isnan(x)) else x for x in self.pr_inf[:n]]
+
+    def to_frame(self, with_meta=True, with_pr_inf=True):
+
+        n = self.i
+        data = {}
+        for k in self.COLUMNS:
+            if k in self.col:
+                data[k] = self.col[k][:n]
+            elif with_pr_inf:
+                data[k] = self._pr_inf_list(n)
+
+        if with_meta:
+            data.update({k: [v] * n for k, v in self.meta.items()
+                         if k != "config_hash"})
+        return pd.DataFrame(data)
+
+    def save(self, folder, f_name, delta_pr_inf=False):
+        """
+        Write the per-iteration table to `folder/f_name` (csv) and
+        the run metadata next to it, in `<f_name stem>.meta.json`.
+        The inferred parameters, if any, go to `<stem>.pr_inf.npy`
+        (one row per iteration, NaN when not inferred, can be memory
+        mapped), or delta-encoded to `<stem>.pr_inf.npz`. The timing
+        spans, if any, go to `<stem>.timing.json`, and the memory
+        report, if any, to `<stem>.memory.json`
+        """
+        os.makedirs(folder, exist_ok=True)
+
+        self.to_frame(with_meta=False, with_pr_inf=False).to_csv(
+            os.path.join(folder, f_name))
+
+        stem = os.path.join(folder, os.path.splitext(f_name)[0])
+        with open(stem + META_EXT, "w") as f:
+            json.dump(self.meta, f, default=str)
+
+        if self.pr_inf is not None:
+            traj = self.pr_inf[:self.i]
+            if delta_pr_inf:
+                np.savez_compressed(stem + PR_INF_DELTA_EXT,
+                                    **delta_encode(traj))
+            else:
+                np.save(stem + PR_INF_EXT, traj)
+
+        if self.timing.hist:
+            with open(stem + TIMING_EXT, "w") as f:
+                json.dump(self.timing.summary(), f)
+
+        if self.memory is not None:
+            with open(stem + MEMORY_EXT, "w") as f:
+                json.dump(self.memory, f)
@@ -0,0 +1,54 @@
+import numpy as np
+
+
+def spawn_rng(seed, agent):
+    """
+    Independent generators of a run: for the replies of the learner,
+    and for the teacher. They only depend on (seed, agent), so that
+    runs of the same agent with different teachers share their replies
+    draws
+    """
+    seed_seq = np.random.SeedSequence(entropy=seed, spawn_key=(agent,))
+    reply_seq, teacher_seq = seed_seq.spawn(2)
+    return np.random.default_rng(reply_seq), \
+        np.random.default_rng(teacher_seq)
+
+
+class ReplyDraws:
+    """
+    Uniform draws deciding the replies of the learner (success if
+    below the recall probability).
+
+    By default one draw per iteration, in order. With `per_item`, the
+    k-th presentation of an item always gets the same draw, whatever
+    the order of the presentations: runs of one agent with different
+    teachers then share the replies to each item, not only the draws of
+    each iteration. With `antithetic`, each draw u is replaced by 1 - u
+    """
+
+    # Presentations per item drawn at once (per_item mode)
+    BLOCK = 64
+
+    def __init__(self, rng, n_item, per_item=False, antithetic=False):
+
+        self.rng = rng
+        self.per_item = per_item
+        self.antithetic = antithetic
+
+        if per_item:
+            self.u = np.zeros((n_item, 0))
+            self.n_pres = np.zeros(n_item, dtype=int)
+
+    def draw(self, item):
+
+        if self.per_item:
+            k = self.n_pres[item]
+            if k >= self.u.shape[1]:
+                self.u = np.hstack(
+                    (self.u, self.rng.random((len(self.u), self.BLOCK))))
+            self.n_pres[item] += 1
+            u = self.u[item, k]
+        else:
+            u = self.rng.random()
+
+        return 1 - u if self.antithetic else u
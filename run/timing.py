@@ -0,0 +1,63 @@
+import math
+import time
+
+
+class Spans:
+    """
+    Wall-clock durations of the parts of a run, each part kept as a
+    histogram with log-spaced bins: constant memory and cost per span,
+    and quantiles known within the width of a bin (9%)
+    """
+
+    # Bins per doubling of the duration (in ns)
+    BIN_PER_OCTAVE = 8
+    N_BIN = 64 * BIN_PER_OCTAVE
+
+    def __init__(self):
+
+        self.hist = {}
+        self.total = {}
+
+    @staticmethod
+    def start():
+        return time.perf_counter_ns()
+
+    def stop(self, name, t0):
+
+        dt = time.perf_counter_ns() - t0
+        b = int(math.log2(dt) * self.BIN_PER_OCTAVE) if dt > 0 else 0
+
+        hist = self.hist.get(name)
+        if hist is None:
+            hist = self.hist[name] = [0] * self.N_BIN
+            self.total[name] = 0
+        hist[b] += 1
+        self.total[name] += dt
+
+    def quantile(self, name, q):
+        """Duration (s) at the center of the bin of the quantile `q`"""
+        hist = self.hist[name]
+        target = q * sum(hist)
+        cum = 0
+        for b, n in enumerate(hist):
+            cum += n
+            if n and cum >= target:
+                return 2 ** ((b + 0.5) / self.BIN_PER_OCTAVE) * 1e-9
+
+    def summary(self):
+        """
+        Per part: number of spans, total and mean duration, p50 and p99
+        (s), and the histogram as {bin: count}, bin b covering
+        [2^(b/BIN_PER_OCTAVE), 2^((b+1)/BIN_PER_OCTAVE)) ns
+        """
+        res = {}
+        for name, hist in self.hist.items():
+            n = sum(hist)
+            res[name] = {
+                "n": n,
+                "total": self.total[name] * 1e-9,
+                "mean": self.total[name] * 1e-9 / n,
+                "p50": self.quantile(name, 0.5),
+                "p99": self.quantile(name, 0.99),
+                "hist": {b: c for b, c in enumerate(hist) if c}}
+        return res
@@ -0,0 +1,69 @@
+"""
+Teachers compared on the same agents with common random numbers: for
+a given agent, every teacher faces the same replies draws (per item,
+see `run.rng.ReplyDraws`), optionally with an antithetic replica.
+The teachers are compared through their paired differences per agent
+"""
+
+import numpy as np
+import pandas as pd
+
+from run.make_data_triton import run
+
+# Keys of the config that may differ between the teachers of a
+# tournament
+TEACHER_KEYS = ("md_teacher", "teacher_pr_lab", "teacher_pr_val",
+                "md_psy", "psy_pr_lab", "psy_pr_val", "data_folder")
+
+
+def agent_key(config):
+    """Configs with the same key are the same agent in the same task"""
+    return tuple((k, str(v)) for k, v in sorted(config.config_dic.items())
+                 if k not in TEACHER_KEYS)
+
+
+def score(recorder):
+    """Number of items learnt at the end of the run"""
+    return recorder.col["n_learnt"][recorder.i - 1]
+
+
+def run_tournament(config_list, antithetic=False, with_tqdm=False):
+    """
+    Score of each teacher of `config_list` (configs of one agent) with
+    common random numbers; averaged over the antithetic pair of runs if
+    `antithetic`. Return {teacher label: score}
+    """
+    if len({agent_key(c) for c in config_list}) != 1:
+        raise ValueError("The configs of a tournament must only differ "
+                         "by their teacher")
+
+    res = {}
+    for config in config_list:
+        label = config.teacher_cls.__name__
+        if label in res:
+            raise ValueError(f"{label} appears twice in the tournament")
+
+        replica = (False, True) if antithetic else (False, )
+        res[label] = np.mean([
+            score(run(config, with_tqdm=with_tqdm, per_item_draws=True,
+                      antithetic=anti))
+            for anti in replica])
+
+    return res
+
+
+def paired_differences(scores, reference):
+    """
+    Difference with the `reference` teacher for each other teacher,
+    `scores` having one row per agent and one column per teacher.
+    Return the mean, standard deviation and standard error of the
+    differences, and the number of agents
+    """
+    diff = scores.drop(columns=reference).sub(scores[reference], axis=0)
+    n = diff.count()
+    std = diff.std(ddof=1)
+    return pd.DataFrame({
+        "mean": diff.mean(),
+        "std": std,
+        "sem": std / np.sqrt(n),
+        "n": n})
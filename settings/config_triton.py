@@ -6,27 +6,40 @@ from model.teacher.leitner import Leitner
 from model.teacher.myopic import Myopic
 from model.teacher.conservative import Conservative
 from model.teacher.robust import Robust
+from model.teacher.info_gain import InfoGain
 
 from model.psychologist.psychologist_grid import PsyGrid
 
 from model.learner.exponential import Exponential
+from model.learner.walsh2018 import Walsh2018
 
 
 TEACHER = {
     Myopic.__name__: Myopic,
     Leitner.__name__: Leitner,
     Conservative.__name__: Conservative,
-    Robust.__name__: Robust
+    Robust.__name__: Robust,
+    InfoGain.__name__: InfoGain
 }
 
 LEARNER = {
-    Exponential.__name__: Exponential
+    Exponential.__name__: Exponential,
+    Walsh2018.__name__: Walsh2018
 }
 
 PSYCHOLOGIST = {
     PsyGrid.__name__: PsyGrid
 }
 
+# Learners supported by the teachers that do not support all of them
+TEACHER_LEARNER = {
+    InfoGain: (Exponential, )
+}
+
+
+def is_compatible(teacher_cls, learner_cls):
+    return learner_cls in TEACHER_LEARNER.get(teacher_cls, (learner_cls, ))
+
 
 class Config:
     def __init__(
@@ -65,6 +78,10 @@ class Config:
         self.psy_cls = PSYCHOLOGIST[md_psy] \
             if md_psy is not None else None
 
+        if not is_compatible(self.teacher_cls, self.learner_cls):
+            raise ValueError(f"Teacher {md_teacher} is not implemented "
+                             f"for the learner {md_learner}")
+
         self.bounds = np.asarray(bounds)
 
         self.param = np.asarray(pr_val)
@@ -12,6 +12,8 @@ JSON_DIR = os.path.join(BASE_DIR, "config")
 
 CONFIG_CLUSTER_DIR = os.path.join(JSON_DIR, "triton")
 
+SWEEP_FILE = os.path.join(CONFIG_CLUSTER_DIR, "sweep.json")
+
 LOG_CLUSTER_DIR = "triton_out"
 
 DATA_DIR = os.path.join(BASE_DIR, "data")
@@ -0,0 +1,103 @@
+import os
+import json
+
+import numpy as np
+
+from settings.config_triton import Config
+
+PARAM_EXT = ".params.npz"
+
+
+def param_path(spec_file):
+    return os.path.splitext(spec_file)[0] + PARAM_EXT
+
+
+class Sweep:
+    """
+    Configs of a sweep, from a compact specification instead of one
+    file per config: every combination of the values of `axes` (the
+    last axis varying fastest) on top of `constants`. The config of
+    any job index is built directly from its index.
+
+    The learner parameters are in the arrays of a binary sidecar,
+    indexed by agent: `pr` (n_agent, n_param) and, for the item
+    specific runs, `pr_item_specific` (n_agent, n_item, n_param).
+    `teacher_pr` gives the parameters of each teacher
+    """
+
+    def __init__(self, axes, constants, teacher_pr, params):
+
+        self.axes = [(k, list(v)) for k, v in axes]
+        self.constants = constants
+        self.teacher_pr = teacher_pr
+        self.params = params
+
+        self.shape = tuple(len(v) for _, v in self.axes)
+        self.n_job = int(np.prod(self.shape))
+
+        # Arrays read from the sidecar so far
+        self.param_cache = {}
+
+    @classmethod
+    def load(cls, file):
+
+        with open(file) as f:
+            spec = json.load(f)
+        return cls(params=np.load(param_path(file)), **spec)
+
+    def save(self, file):
+
+        with open(file, "w") as f:
+            json.dump({"axes": self.axes,
+                       "constants": self.constants,
+                       "teacher_pr": self.teacher_pr}, f, indent=4)
+        np.savez(param_path(file), **self.params)
+
+    def param(self, name):
+
+        if name not in self.param_cache:
+            self.param_cache[name] = np.asarray(self.params[name])
+        return self.param_cache[name]
+
+    def job(self, idx):
+        """Value of each axis for job `idx`"""
+        if not 0 <= idx < self.n_job:
+            raise IndexError(f"Job {idx} not in a sweep of {self.n_job}")
+
+        pos = np.unravel_index(idx, self.shape)
+        return {k: v[p] for (k, v), p in zip(self.axes, pos)}
+
+    def config(self, idx):
+
+        dic = dict(self.constants, **self.job(idx))
+
+        agent = dic["agent"]
+        is_item_specific = dic["is_item_specific"]
+        md_learner = dic["md_learner"]
+        md_psy = dic["md_psy"]
+        md_teacher = dic["md_teacher"]
+
+        pr = self.param("pr_item_specific" if is_item_specific else "pr")
+        teacher_pr = self.teacher_pr.get(md_teacher, {})
+
+        spec_str = 'spec' if is_item_specific else 'Nspec'
+        omni_str = 'omni' if dic["omni"] else 'Nomni'
+
+        dic.update({
+            "seed": dic["seed"] + agent,
+            "pr_val": pr[agent].tolist(),
+            "teacher_pr_lab": list(teacher_pr.keys()),
+            "teacher_pr_val": list(teacher_pr.values()),
+            "data_folder": os.path.join(
+                dic["data_folder"],
+                f"{spec_str}-{omni_str}",
+                f"{md_learner}-{md_psy}-{md_teacher}"),
+        })
+
+        config_file = f"{idx}-{md_learner}-{md_psy}-{md_teacher}-a{agent}.json"
+        return Config(config_file=config_file, config_dic=dic, **dic)
+
+    def configs(self):
+
+        for idx in range(self.n_job):
+            yield self.config(idx)
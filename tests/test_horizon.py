@@ -0,0 +1,37 @@
+"""
+Receding horizon: with more items seen than fit in a session, planning
+a few sessions ahead learns about as many items as planning them all
+"""
+
+import numpy as np
+import pytest
+
+from benchmark.cases import make_config
+from run.make_data_triton import run
+
+N_SS = 6
+SS_N_ITER = 20
+
+
+def final_n_learnt(teacher, horizon):
+
+    config = make_config(learner="Exponential", teacher=teacher,
+                         n_item=150, horizon=horizon, n_sample=5,
+                         n_ss=N_SS, ss_n_iter=SS_N_ITER)
+    config.omniscient = True
+    config.param = np.array([3e-6, 0.5])
+
+    recorder = run(config)
+    return recorder.col["n_learnt"][recorder.i - 1]
+
+
+@pytest.mark.parametrize("teacher", ["Conservative", "Robust"])
+@pytest.mark.parametrize("horizon", [1, 2])
+def test_horizon_close_to_full(teacher, horizon):
+
+    full = final_n_learnt(teacher, horizon=None)
+    assert full > SS_N_ITER
+
+    n_learnt = final_n_learnt(teacher, horizon=horizon)
+    assert n_learnt > SS_N_ITER
+    assert n_learnt >= 0.85 * full
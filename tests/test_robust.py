@@ -0,0 +1,38 @@
+"""
+Robust teacher: reusing the particles across asks learns about as many
+items as drawing a fresh set at every ask, and does not get stuck on
+the few items presented first
+"""
+
+import numpy as np
+
+from benchmark.cases import make_config
+from run.make_data_triton import run
+
+SEEDS = range(1, 4)
+
+
+def n_learnt_and_presented(**teacher_pr):
+
+    n_learnt, n_presented = 0, 0
+    for seed in SEEDS:
+        config = make_config(learner="Exponential", teacher="Robust",
+                             n_item=30, n_sample=10, n_ss=3, ss_n_iter=15)
+        config.seed = seed
+        config.teacher_pr = dict(n_sample=10, **teacher_pr)
+
+        recorder = run(config)
+        n_learnt += recorder.col["n_learnt"][recorder.i - 1]
+        n_presented += len(np.unique(recorder.col["item"][:recorder.i]))
+
+    return n_learnt, n_presented
+
+
+def test_reuse_close_to_fresh():
+
+    fresh_learnt, fresh_presented = n_learnt_and_presented()
+    assert fresh_learnt > 0
+
+    n_learnt, n_presented = n_learnt_and_presented(reuse_samples=True)
+    assert n_learnt >= 0.5 * fresh_learnt
+    assert n_presented >= 0.75 * fresh_presented